@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import statistics
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+async def measure(args) -> dict:
+    """
+    以 stdio 方式启动一次服务，记录从启动进程开始到各阶段完成的时间（秒）
+    """
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(ROOT, "server.py"), "--transport", "stdio"],
+        env=dict(os.environ),
+        cwd=ROOT,
+    )
+    timings = {}
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            timings["initialize"] = time.perf_counter() - start
+
+            tools = await session.list_tools()
+            timings["list_tools"] = time.perf_counter() - start
+            timings["tools"] = len(tools.tools)
+
+            if args.tool:
+                result = await session.call_tool(args.tool, json.loads(args.arguments))
+                timings["tool_result"] = time.perf_counter() - start
+                if result.isError:
+                    timings["error"] = result.content[0].text if result.content else "error"
+    return timings
+
+
+def summarize(runs: list) -> None:
+    print(f"{'阶段':<14}{'最小':>10}{'中位数':>10}{'最大':>10}")
+    for phase in ("initialize", "list_tools", "tool_result"):
+        values = [run[phase] for run in runs if phase in run]
+        if values:
+            print(f"{phase:<14}{min(values):>10.3f}{statistics.median(values):>10.3f}{max(values):>10.3f}")
+    print(f"工具数量: {runs[-1]['tools']}")
+    errors = [run["error"] for run in runs if "error" in run]
+    if errors:
+        print(f"工具调用失败: {errors[-1]}")
+
+
+async def main(args):
+    runs = []
+    for i in range(args.runs):
+        if args.cold:
+            # 删除工具清单缓存，测量首次启动（需要导入数据供应商并生成清单）的时间
+            shutil.rmtree(os.path.join(ROOT, os.getenv("FINDATA_CACHE_DIR", "cache"), "manifest"), ignore_errors=True)
+        timings = await measure(args)
+        print(f"第{i + 1}次: " + ", ".join(f"{k}={v:.3f}s" for k, v in timings.items() if isinstance(v, float)))
+        runs.append(timings)
+    summarize(runs)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="finData MCP Server 启动耗时测试（stdio）")
+
+    parser.add_argument("--runs", type=int, default=5, help="启动次数 (default: 5)")
+    parser.add_argument("--tool", type=str, default="cn_pmi", help="首次调用的工具，为空时不调用 (default: cn_pmi)")
+    parser.add_argument("--arguments", type=str, default="{}", help="工具参数，JSON 格式 (default: {})")
+    parser.add_argument("--cold", action="store_true", help="每次启动前删除工具清单缓存")
+
+    asyncio.run(main(parser.parse_args()))
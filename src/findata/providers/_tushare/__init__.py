@@ -3,6 +3,7 @@ from .fundamentalData import  stock_company
 from .fundamentalData import bak_basic
 
 from .marketData import daily
+from .marketData import daily_bulk
 
 from .macroeconomicData import shibor_lpr
 from .macroeconomicData import cn_gdp
@@ -11,7 +12,16 @@ from .macroeconomicData import cn_ppi
 from .macroeconomicData import cn_m
 from .macroeconomicData import sf_month
 from .macroeconomicData import cn_pmi
+from .macroeconomicData import macro_panel
 
 from .financialData import income
 from .financialData import balancesheet
-from .financialData import cashflow
\ No newline at end of file
+from .financialData import cashflow
+from .financialData import financial_bulk
+from .financialData import financial_statements
+from .financialData import financial_ratios
+
+from .fieldDictionary import field_dictionary
+
+from .common import get_stats
+from .jobs import register_jobs
@@ -0,0 +1,111 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+# 一天的秒数
+DAY = 86400
+
+# 包含当日数据的行情缓存有效期（秒）
+TODAY_TTL = int(os.getenv("FINDATA_CACHE_TODAY_TTL", "300"))
+
+# 未配置规则的接口缓存有效期（秒）
+DEFAULT_TTL = int(os.getenv("FINDATA_CACHE_DEFAULT_TTL", "3600"))
+
+# 已过去的报告期/公告窗口的财务报表缓存有效期（秒），到期后重新获取以得到更正后的版本（update_flag）
+STATEMENT_TTL = int(os.getenv("FINDATA_CACHE_STATEMENT_TTL", str(30 * DAY)))
+
+MARKET_APIS = {"daily", "bak_basic"}
+STATEMENT_APIS = {"income", "balancesheet", "cashflow"}
+BASIC_APIS = {"stock_basic", "stock_company"}
+
+# 宏观数据大致的发布日（每月几号），GDP 在每季度首月发布
+MACRO_RELEASE_DAY = {
+    "cn_pmi": 1,
+    "cn_cpi": 10,
+    "cn_ppi": 10,
+    "cn_m": 15,
+    "sf_month": 15,
+    "cn_gdp": 20,
+    "shibor_lpr": 21,
+}
+QUARTERLY_APIS = {"cn_gdp"}
+
+
+def _last_period(params: dict, single: str, end: str) -> str:
+    """取查询中最晚的日期/月份/季度"""
+    if params.get(end):
+        return str(params[end])
+    if params.get(single):
+        return max(p.strip() for p in str(params[single]).split(","))
+    return ""
+
+
+def _month_index(period: str) -> int:
+    """将 YYYYMM、YYYYQn 或 YYYYMMDD 转换为自公元起的月份序号"""
+    period = period.upper()
+    year = int(period[:4])
+    if "Q" in period:
+        month = int(period[period.index("Q") + 1]) * 3
+    else:
+        month = int(period[4:6])
+    return year * 12 + month - 1
+
+
+def next_release(api_name: str, now: datetime) -> datetime:
+    """下一次宏观数据发布时间"""
+    day = MACRO_RELEASE_DAY[api_name]
+    months = (1, 4, 7, 10) if api_name in QUARTERLY_APIS else range(1, 13)
+    for offset in range(0, 13):
+        year = now.year + (now.month - 1 + offset) // 12
+        month = (now.month - 1 + offset) % 12 + 1
+        release = datetime(year, month, day)
+        if month in months and release > now:
+            return release
+    return now + timedelta(days=31)
+
+
+def ttl_for(api_name: str, params: dict, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    tushare 接口结果的缓存有效期（秒），返回 None 表示数据已固定，永久有效
+
+    - 行情数据：截止日期早于今天的为已收盘数据，永久有效；包含今天的短期有效
+    - 财务报表：公告日期窗口已结束或报告期已过去一年以上的长期有效（仍可能被更正），其余当天有效
+    - 宏观数据：一年以前的数据永久有效，其余在下一次发布时过期
+    - 基础信息：当天有效
+    """
+    now = now or datetime.now()
+    today = now.strftime("%Y%m%d")
+
+    try:
+        if api_name in MARKET_APIS:
+            last_date = _last_period(params, "trade_date", "end_date")
+            if last_date and last_date < today:
+                return None
+            return TODAY_TTL
+
+        if api_name in STATEMENT_APIS:
+            if params.get("end_date") and str(params["end_date"]) < today:
+                return STATEMENT_TTL
+            period = params.get("period")
+            if period and _month_index(str(period)) + 12 < _month_index(today):
+                return STATEMENT_TTL
+            return DAY
+
+        if api_name in MACRO_RELEASE_DAY:
+            if api_name == "shibor_lpr":
+                last_period = _last_period(params, "date", "end_date")
+            elif api_name in QUARTERLY_APIS:
+                last_period = _last_period(params, "q", "end_q")
+            else:
+                last_period = _last_period(params, "m", "end_m")
+            if last_period and _month_index(last_period) + 12 < _month_index(today):
+                return None
+            return (next_release(api_name, now) - now).total_seconds()
+
+        if api_name in BASIC_APIS:
+            return DAY
+
+    except (ValueError, IndexError):
+        pass
+
+    return DEFAULT_TTL
@@ -1,36 +1,176 @@
-from utils.date_processor import standardize_date
-from utils.auth import login
+import os
+import numpy as np
+import pandas as pd
+from utils.date_processor import standardize_date, date_cache_info
+from utils.auth import session_manager
+from utils.executor import executor
+from utils.cache import ResultCache, get_cache_dir, make_key
+from utils.rate_limiter import rate_limiter, request_priority
+from utils.scheduler import scheduler
+from utils.single_flight import single_flight
+from utils.findata_log import setup_logger
+from .cachePolicy import ttl_for
+from .macroStore import macro_store
+from .securityMaster import security_master
+from .tradeCalendar import CALENDAR_START, get_calendar, to_datetime64, to_date_str
 
-def get_trade_dates(
+logger = setup_logger()
+
+# 接口结果缓存
+CACHE_ENABLED = os.getenv("FINDATA_CACHE_ENABLED", "1") == "1"
+
+result_cache = ResultCache(
+    get_cache_dir("results"),
+    max_bytes=int(os.getenv("FINDATA_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+    ttl_policy=ttl_for,
+)
+
+# 批量请求失败后的重试次数
+BULK_RETRIES = int(os.getenv("FINDATA_BULK_RETRIES", "3"))
+
+
+def _fetch(api_name: str, use_cache: bool, params: dict):
+    """请求数据接口并写入缓存（在线程池中执行）"""
+    df = session_manager.call(api_name, **params)
+    if use_cache:
+        key_params = {name: value for name, value in params.items() if name != "fields"}
+        result_cache.put(api_name, key_params, params.get("fields"), df)
+    return df
+
+
+def is_rate_limited(e: Exception) -> bool:
+    """tushare 返回超出每分钟访问次数的错误"""
+    return "每分钟最多访问" in str(e)
+
+
+async def query(api_name: str, cache: bool = True, priority: int = None, **params):
+    """
+    调用tushare数据接口，使用进程内共享的客户端与会话池，
+    在线程池中执行以免阻塞事件循环；cache 为 True 时优先读取本地结果缓存；
+    请求前按接口配额排队获取令牌，priority 越小越优先（默认使用当前任务的优先级）；相同的并发请求合并为一次
+    """
+    if priority is None:
+        priority = request_priority.get()
+    use_cache = cache and CACHE_ENABLED
+    key_params = {name: value for name, value in params.items() if name != "fields"}
+    if use_cache:
+        df = result_cache.get(api_name, key_params, params.get("fields"))
+        if df is not None:
+            return df
+
+    # 相同参数的并发请求只向接口请求一次
+    key = make_key(api_name, key_params, params.get("fields"))
+    df, shared = await single_flight.do(key, lambda: _query_upstream(api_name, use_cache, priority, params))
+    if shared and isinstance(df, pd.DataFrame):
+        df = df.copy(deep=False)
+    return df
+
+
+async def _query_upstream(api_name: str, use_cache: bool, priority: int, params: dict):
+    """按配额获取令牌后请求接口，超出配额时等待后重试一次"""
+    await rate_limiter.acquire(api_name, priority)
+    try:
+        return await executor.run(api_name, _fetch, api_name, use_cache, params)
+    except Exception as e:
+        if not is_rate_limited(e):
+            raise
+        # 超出配额：清空令牌，等待补充后重试一次
+        logger.warning(f"{api_name} 超出访问频率限制，等待后重试")
+        rate_limiter.penalize(api_name)
+        await rate_limiter.acquire(api_name, priority)
+        return await executor.run(api_name, _fetch, api_name, use_cache, params)
+
+
+def get_stats() -> dict:
+    """
+    运行统计：客户端与会话池、执行器、限流、请求合并、结果缓存、日期解析缓存、证券主表、宏观序列、后台任务
+    """
+    return {
+        "session": session_manager.stats(),
+        "executor": executor.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "single_flight": single_flight.stats(),
+        "cache": result_cache.stats(),
+        "date_cache": date_cache_info(),
+        "security_master": security_master.stats(),
+        "macro_store": macro_store.stats(),
+        "scheduler": scheduler.stats(),
+    }
+
+
+def select_fields(df: pd.DataFrame, fields: list) -> pd.DataFrame:
+    """按请求的字段选取列"""
+    if df is None:
+        return pd.DataFrame(columns=fields or None)
+    if fields and not df.empty:
+        df = df[[field for field in df.columns if field in fields]]
+    return df
+
+
+def split_trade_dates(trade_dates: np.ndarray, batch_size: int) -> list:
+    """
+    将升序的交易日数组按 batch_size 个交易日切分，返回 [(开始日期, 结束日期), ...]，日期格式为 YYYYMMDD
+    """
+    batch_size = max(int(batch_size), 1)
+    batches = []
+    for i in range(0, len(trade_dates), batch_size):
+        batch = trade_dates[i:i + batch_size]
+        start, end = to_date_str([batch[0], batch[-1]])
+        batches.append((start, end))
+    return batches
+
+
+async def get_trade_dates(
         start_date: str = "",
         end_date: str = "" ,
-        exchange: str = "", 
+        exchange: str = "",
         is_open: str = "1"
 ) -> dict:
     """
     获取各大交易所交易日历数据,默认提取的是上交所
+
+    数据来自本地交易日历，仅在本地未覆盖指定范围时增量同步
     """
-    # 登录tushare
     try:
-        tsObj = login()
+        dates = await get_trade_date_array(start_date=start_date, end_date=end_date, exchange=exchange, is_open=is_open)
 
-        # 日期标准化
-        if start_date:
-            start_date = standardize_date(start_date)
-
-        if end_date:
-            end_date = standardize_date(end_date)
-        
-        df = tsObj.trade_cal(exchange=exchange, start_date=start_date, end_date=end_date, is_open=is_open)
-
-        return df['cal_date'].dropna().unique().tolist()
+        return to_date_str(dates)
 
     except Exception as e:
             raise Exception(f"获取交易日列表失败！\n {str(e)}") from e
 
 
+async def get_trade_date_array(
+        start_date: str = "",
+        end_date: str = "",
+        exchange: str = "",
+        is_open: str = "1"
+) -> np.ndarray:
+    """
+    获取交易日历，返回升序的 datetime64[D] 数组
+    """
+    calendar = get_calendar(exchange)
+
+    # 日期标准化
+    if start_date:
+        start_date = standardize_date(start_date)
+
+    if end_date:
+        end_date = standardize_date(end_date)
+
+    await calendar.ensure(start_date or calendar.coverage_start or CALENDAR_START,
+                          end_date or calendar.coverage_end or CALENDAR_START)
 
+    start = to_datetime64(start_date) if start_date else calendar.coverage_start
+    end = to_datetime64(end_date) if end_date else calendar.coverage_end
+    if start is None or end is None or start > end:
+        return np.array([], dtype="datetime64[D]")
 
+    open_dates = calendar.range(start, end)
+    if is_open == "1":
+        return open_dates
 
-    
-    
\ No newline at end of file
+    all_dates = np.arange(start, end + 1, dtype="datetime64[D]")
+    if is_open == "0":
+        return np.setdiff1d(all_dates, open_dates, assume_unique=True)
+    return all_dates
@@ -0,0 +1,157 @@
+import os
+import json
+import asyncio
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.findata_log import setup_logger
+from .tradeCalendar import get_calendar, sorted_contains, to_datetime64, to_datetime64_array, to_date_str
+
+logger = setup_logger()
+
+
+def merge_intervals(intervals: list) -> list:
+    """合并重叠的 [开始日期, 结束日期] 区间（YYYYMMDD）"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(trade_dates: np.ndarray, covered: list) -> list:
+    """
+    找出未覆盖的交易日，按交易日连续性合并为 [(开始日期, 结束日期), ...]
+    """
+    mask = np.zeros(len(trade_dates), dtype=bool)
+    for start, end in covered:
+        mask |= (trade_dates >= to_datetime64(start)) & (trade_dates <= to_datetime64(end))
+
+    missing_idx = np.flatnonzero(~mask)
+    if not len(missing_idx):
+        return []
+
+    # 交易日下标不连续的位置即为分段点
+    breaks = np.flatnonzero(np.diff(missing_idx) != 1) + 1
+    ranges = []
+    for run in np.split(missing_idx, breaks):
+        start, end = to_date_str([trade_dates[run[0]], trade_dates[run[-1]]])
+        ranges.append((start, end))
+    return ranges
+
+
+class DailyBarStore:
+    """
+    按股票保存的日线行情
+
+    每只股票的日线保存为一个本地列式文件，并记录已同步过的日期区间；
+    查询时根据交易日历找出缺失的交易日，只向接口请求缺失的区间再拼接，
+    停牌等没有数据的交易日也会记为已同步，不会被重复请求。
+    """
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._locks = {}
+
+    def _paths(self, ts_code: str):
+        base = os.path.join(self.store_dir, ts_code.upper())
+        return base + FRAME_SUFFIX, base + ".json"
+
+    def _lock(self, ts_code: str) -> asyncio.Lock:
+        lock = self._locks.get(ts_code)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[ts_code] = lock
+        return lock
+
+    def load_covered(self, ts_code: str) -> list:
+        """读取已同步的日期区间"""
+        _, meta_path = self._paths(ts_code)
+        if not os.path.exists(meta_path):
+            return []
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)["covered"]
+        except Exception:
+            return []
+
+    def gaps(self, ts_code: str, trade_dates: np.ndarray) -> list:
+        """指定交易日中尚未同步的区间"""
+        return missing_ranges(trade_dates, self.load_covered(ts_code.upper()))
+
+    def load(self, ts_code: str):
+        """读取本地日线及已同步区间"""
+        frame_path, meta_path = self._paths(ts_code)
+        if not (os.path.exists(frame_path) and os.path.exists(meta_path)):
+            return None, []
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                covered = json.load(f)["covered"]
+            return read_frame(frame_path), covered
+        except Exception:
+            logger.warning(f"读取{ts_code}本地日线失败，将重新下载", exc_info=True)
+            return None, []
+
+    def save(self, ts_code: str, df: pd.DataFrame, covered: list):
+        frame_path, meta_path = self._paths(ts_code)
+        write_frame(df, frame_path)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"covered": covered}, f)
+        os.replace(tmp_path, meta_path)
+
+    async def get(self, ts_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取 [start_date, end_date] 的日线（全部字段），缺失的交易日从接口补齐
+        """
+        from .common import query
+
+        ts_code = ts_code.upper()
+        calendar = get_calendar()
+        await calendar.ensure(start_date, end_date)
+        trade_dates = calendar.range(start_date, end_date)
+
+        async with self._lock(ts_code):
+            df, covered = self.load(ts_code)
+            gaps = missing_ranges(trade_dates, covered)
+
+            if gaps:
+                logger.debug(f"{ts_code}日线缺失区间: {gaps}")
+                results = await asyncio.gather(*[
+                    query("daily", cache=False, ts_code=ts_code, start_date=gap_start, end_date=gap_end)
+                    for gap_start, gap_end in gaps
+                ], return_exceptions=True)
+                # 只有获取成功的区间记为已同步，失败的区间下次查询时重新获取
+                errors = [result for result in results if isinstance(result, BaseException)]
+                fetched = [gap for gap, result in zip(gaps, results) if not isinstance(result, BaseException)]
+                frames = [frame for frame in ([df] + [r for r in results if not isinstance(r, BaseException)])
+                          if frame is not None and not frame.empty]
+
+                if frames:
+                    df = pd.concat(frames, ignore_index=True)
+                    df = df.drop_duplicates(subset=["trade_date"], keep="last")
+                    df = df.sort_values("trade_date", ascending=False, kind="stable").reset_index(drop=True)
+
+                # 当天的行情可能尚未更新完整，不记为已同步
+                last_closed = calendar.previous_trading_day(datetime.now().strftime("%Y%m%d"))
+                if last_closed is not None:
+                    last_closed = to_date_str([last_closed])[0]
+                    new_covered = [[gap_start, min(gap_end, last_closed)]
+                                   for gap_start, gap_end in fetched if gap_start <= last_closed]
+                    covered = merge_intervals(covered + new_covered)
+
+                if fetched:
+                    self.save(ts_code, df if df is not None else pd.DataFrame(), covered)
+                if errors:
+                    raise errors[0]
+
+        if df is None or df.empty:
+            return pd.DataFrame()
+
+        mask = sorted_contains(trade_dates, to_datetime64_array(df["trade_date"]))
+        return df[mask].reset_index(drop=True)
+
+
+daily_store = DailyBarStore(get_cache_dir("daily"))
@@ -0,0 +1,65 @@
+import pandas as pd
+from functools import lru_cache
+from typing import Optional
+from utils.field_catalog import field_catalog
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+
+@lru_cache(maxsize=1)
+def field_table() -> pd.DataFrame:
+    """全部工具的字段说明，由导入时解析各工具说明得到的字段目录生成一次"""
+    return pd.DataFrame(field_catalog.records(), columns=["api_name", "field", "description"])
+
+
+async def field_dictionary(
+    api_name: Optional[str] = "",
+    keyword: Optional[str] = "",
+    field_names: Optional[list] = None,
+) -> dict:
+    """
+    Name:
+        字段说明。
+
+    Description:
+        查询各工具返回字段的含义，可以按工具、字段名或关键字筛选。
+        精简模式（FINDATA_COMPACT_TOOLS=1）下工具说明不包含字段列表，需要选择 fields 时先用本工具查询。
+
+    Args:
+        | 名称        | 类型 | 必填 | 描述                                                     |
+        |-------------|------|------|----------------------------------------------------------|
+        | api_name    | str  | 否   | 工具名称，如 income，多个用逗号分隔；不填时返回全部工具的字段 |
+        | keyword     | str  | 否   | 关键字，匹配字段名或字段说明，如 研发、eps                  |
+        | field_names | list | 否   | 只返回指定的字段                                           |
+
+    Fields:
+        - api_name：工具名称
+        - field：字段名
+        - description：字段说明
+    """
+    try:
+        df = field_table()
+
+        apis = [a.strip() for a in (api_name or "").split(",") if a.strip()]
+        if apis:
+            unknown = [a for a in apis if a not in field_catalog.apis()]
+            if unknown:
+                raise ValueError(f"没有以下工具的字段说明: {', '.join(unknown)}，可选: {', '.join(field_catalog.apis())}")
+            df = df[df["api_name"].isin(apis)]
+
+        if field_names:
+            df = df[df["field"].isin([f.strip() for f in field_names])]
+
+        if keyword:
+            keyword = keyword.strip()
+            df = df[
+                df["field"].str.contains(keyword, case=False, regex=False)
+                | df["description"].str.contains(keyword, case=False, regex=False)
+            ]
+
+        return df.reset_index(drop=True)
+
+    except Exception as e:
+        logger.error(f"获取字段说明失败！\n ", exc_info=True)
+        raise Exception(f"获取字段说明失败！\n {str(e)}") from e
@@ -1,11 +1,32 @@
 import os
+import asyncio
+import numpy as np
 import pandas as pd
 from typing import Optional
+from utils.cache import get_cache_dir, make_key
+from utils.checkpoint import Checkpoint
 from utils.date_processor import standardize_date
-from utils.auth import login
+from utils.field_catalog import field_catalog, register_fields
+from utils.findata_log import setup_logger
+from utils.rate_limiter import PRIORITY_BULK
+from .common import BULK_RETRIES, query, select_fields
+from .ratioEngine import RATIOS, compute_ratios, quarter_end, quarter_index, ratio_store
+from .securityMaster import normalize_ts_code, security_master
+from .statementStore import as_of_filter, filter_statements, statement_store
+
+logger = setup_logger()
+
+# 批量报表任务每完成多少支股票保存一次断点
+CHECKPOINT_EVERY = int(os.getenv("FINDATA_CHECKPOINT_EVERY", "100"))
+
+# 是否使用按报告期获取全市场数据的VIP接口（income_vip 等，需要相应权限）
+USE_VIP_APIS = os.getenv("FINDATA_FINANCIAL_VIP", "0") == "1"
+
+STATEMENT_APIS = ("income", "balancesheet", "cashflow")
 
 
 # 利润表
+@register_fields()
 async def income(
     ts_code: str = "",
     ann_date: Optional[str] = "",
@@ -15,7 +36,8 @@ async def income(
     period: Optional[str] = "",
     report_type: Optional[str] = "",
     comp_type: Optional[str] = "",
-    fields: Optional[list] = [],
+    as_of: Optional[str] = "",
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -27,7 +49,7 @@ async def income(
     Args:
         | 名称       | 类型   | 必选 | 描述                                                                 |
         |------------|--------|------|----------------------------------------------------------------------|
-        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票                                                                |
+        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写                                                                |
         | ann_date   | str    | 否    | 公告日期（YYYYMMDD格式）                                       |
         | f_ann_date | str    | 否    | 实际公告日期（YYYYMMDD格式）                                           |
         | start_date | str    | 否    | 公告开始日期（YYYYMMDD格式）                                           |
@@ -35,6 +57,7 @@ async def income(
         | period     | str    | 否    | 报告期(每个季度最后一天的日期，比如20171231表示年报，20170630半年报，20170930三季报) |
         | report_type| str    | 否    | 报告类型，参考文档最下方说明                                         |
         | comp_type  | str    | 否    | 公司类型（一般工商业：1，银行：2，保险：3，证券：4）                               |
+        | as_of      | str    | 否    | 时点日期（YYYYMMDD格式），只返回截至该日已公告的数据，每个报告期取当时最新的版本 |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段  |
 
     Fields:
@@ -134,9 +157,6 @@ async def income(
         - update_flag：更新标识
     """
     try:
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         if ann_date:
             ann_date = standardize_date(ann_date)
@@ -150,24 +170,32 @@ async def income(
         if f_ann_date:
             f_ann_date = standardize_date(f_ann_date)
 
-        #TODO 股票代码 标准化
-
-        # 添加必须存在的字段
-        if  fields:
-            fields.append('ann_date')
-            fields.append('f_ann_date')
-            fields.append('end_date')
-            fields = list(set(fields))
-            
-        df = tsObj.income(ts_code=ts_code, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, fields=fields)
-        # return df.to_json()
-        return df
+        if as_of:
+            as_of = standardize_date(as_of)
+
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
+
+        # 校验字段并添加必须存在的字段
+        required = ['ann_date', 'f_ann_date', 'end_date']
+        if as_of:
+            required.extend(['report_type', 'update_flag'])
+        fields = field_catalog.projection("income", fields, required=required)
+
+        # 默认报告类型从本地报表库查询（每天增量同步一次），其余情况请求接口
+        if ts_code and report_type in ("", "1"):
+            df = await statement_store.query("income", ts_code, as_of=as_of, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, comp_type=comp_type)
+            return select_fields(df, fields)
+
+        df = await query("income", ts_code=ts_code, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, fields=fields)
+        return as_of_filter(df, as_of) if as_of else df
     
     except Exception as e:
         raise Exception(f"获取上市公司财务利润表数据失败！\n {str(e)}") from e
 
 
 # 资产负债表
+@register_fields()
 async def balancesheet(
     ts_code: str = "",
     ann_date: Optional[str] = "",
@@ -176,7 +204,8 @@ async def balancesheet(
     period: Optional[str] = "",
     report_type: Optional[str] = "",
     comp_type: Optional[str] = "",
-    fields: Optional[list] = [],
+    as_of: Optional[str] = "",
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -188,13 +217,14 @@ async def balancesheet(
     Args:
         | 名称       | 类型   | 必选 | 描述                                                                 |
         |------------|--------|------|----------------------------------------------------------------------|
-        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票                                                               |
+        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写                                                               |
         | ann_date   | str    | 否    | 公告日期（YYYYMMDD格式）                                       |
         | start_date | str    | 否    | 公告开始日期（YYYYMMDD格式）                                           |
         | end_date   | str    | 否    | 公告结束日期 （YYYYMMDD格式）                                          |
         | period     | str    | 否    | 报告期(每个季度最后一天的日期，比如20171231表示年报，20170630半年报，20170930三季报) |
         | report_type| str    | 否    | 报告类型，参考文档最下方说明                                         |
         | comp_type  | str    | 否    | 公司类型（一般工商业：1，银行：2，保险：3，证券：4）                               |
+        | as_of      | str    | 否    | 时点日期（YYYYMMDD格式），只返回截至该日已公告的数据，每个报告期取当时最新的版本 |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段，必须包含ann_date、f_ann_date、end_date  |
 
     Fields:
@@ -359,9 +389,6 @@ async def balancesheet(
 
     """
     try:
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         if ann_date:
             ann_date = standardize_date(ann_date)
@@ -372,23 +399,31 @@ async def balancesheet(
         if end_date:
             end_date = standardize_date(end_date)
 
-        #TODO 股票代码 标准化
-
-        # 添加必须存在的字段
-        if  fields:
-            fields.append('ann_date')
-            fields.append('f_ann_date')
-            fields.append('end_date')
-            fields = list(set(fields))
-            
-        df = tsObj.balancesheet(ts_code=ts_code, ann_date=ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, fields=fields)
-        # return df.to_json()
-        return df
+        if as_of:
+            as_of = standardize_date(as_of)
+
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
+
+        # 校验字段并添加必须存在的字段
+        required = ['ann_date', 'f_ann_date', 'end_date']
+        if as_of:
+            required.extend(['report_type', 'update_flag'])
+        fields = field_catalog.projection("balancesheet", fields, required=required)
+
+        # 默认报告类型从本地报表库查询（每天增量同步一次），其余情况请求接口
+        if ts_code and report_type in ("", "1"):
+            df = await statement_store.query("balancesheet", ts_code, as_of=as_of, ann_date=ann_date, start_date=start_date, end_date=end_date, period=period, comp_type=comp_type)
+            return select_fields(df, fields)
+
+        df = await query("balancesheet", ts_code=ts_code, ann_date=ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, fields=fields)
+        return as_of_filter(df, as_of) if as_of else df
     
     except Exception as e:
         raise Exception(f"获取上市公司财务利润表数据失败！\n {str(e)}") from e
 
 # 现金流量表
+@register_fields()
 async def cashflow(
     ts_code: str = "",
     ann_date: Optional[str] = "",
@@ -399,7 +434,8 @@ async def cashflow(
     report_type: Optional[str] = "",
     comp_type: Optional[str] = "",
     is_calc: Optional[int] = 0,
-    fields: Optional[list] = [],
+    as_of: Optional[str] = "",
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -411,7 +447,7 @@ async def cashflow(
     Args:
         | 名称       | 类型   | 必选 | 描述                                                                 |
         |------------|--------|------|----------------------------------------------------------------------|
-        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票                                                             |
+        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写                                                             |
         | ann_date   | str    | 否    | 公告日期（YYYYMMDD格式）                                       |
         | f_ann_date   | str    | 否    | 实际公告日期（YYYYMMDD格式）                                       |
         | start_date | str    | 否    | 公告开始日期（YYYYMMDD格式）                                           |
@@ -420,6 +456,7 @@ async def cashflow(
         | report_type| str    | 否    | 报告类型，参考文档最下方说明                                         |
         | comp_type  | str    | 否    | 公司类型（一般工商业：1，银行：2，保险：3，证券：4）                               |
         | is_calc  | int    | 否    | 是否计算报表                               |
+        | as_of      | str    | 否    | 时点日期（YYYYMMDD格式），只返回截至该日已公告的数据，每个报告期取当时最新的版本 |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段，必须包含ann_date、f_ann_date、end_date  |
 
     Fields:
@@ -524,9 +561,6 @@ async def cashflow(
     """
 
     try:
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         if ann_date:
             ann_date = standardize_date(ann_date)
@@ -540,22 +574,365 @@ async def cashflow(
         if end_date:
             end_date = standardize_date(end_date)
 
-        #TODO 股票代码 标准化
+        if as_of:
+            as_of = standardize_date(as_of)
 
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
 
-        # 添加必须存在的字段
-        if  fields:
-            fields.append('ann_date')
-            fields.append('f_ann_date')
-            fields.append('end_date')
-            fields = list(set(fields))
-            
-        df = tsObj.cashflow(ts_code=ts_code, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, is_calc=is_calc, fields=fields)
-        # return df.to_json()
-        return df
+
+        # 校验字段并添加必须存在的字段
+        required = ['ann_date', 'f_ann_date', 'end_date']
+        if as_of:
+            required.extend(['report_type', 'update_flag'])
+        fields = field_catalog.projection("cashflow", fields, required=required)
+
+        # 默认报告类型从本地报表库查询（每天增量同步一次），其余情况请求接口
+        if ts_code and report_type in ("", "1") and not is_calc:
+            df = await statement_store.query("cashflow", ts_code, as_of=as_of, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, comp_type=comp_type)
+            return select_fields(df, fields)
+
+        df = await query("cashflow", ts_code=ts_code, ann_date=ann_date, f_ann_date=f_ann_date, start_date=start_date, end_date=end_date, period=period, report_type=report_type, comp_type=comp_type, is_calc=is_calc, fields=fields)
+        return as_of_filter(df, as_of) if as_of else df
     
     except Exception as e:
         raise Exception(f"获取上市公司现金流量表数据失败！\n {str(e)}") from e
 
 
+# 合并报表的对齐键
+STATEMENT_KEYS = ["ts_code", "end_date", "report_type"]
+
 
+def route_fields(fields: list) -> dict:
+    """
+    将字段分配到报表：可以用 "cashflow.credit_impa_loss" 指定报表，
+    否则按利润表、资产负债表、现金流量表的顺序分配到第一个包含该字段的报表
+    """
+    routed = {api_name: [] for api_name in STATEMENT_APIS}
+    for field in fields:
+        api_name, _, name = field.rpartition(".")
+        if api_name:
+            if api_name not in routed:
+                raise ValueError(f"不支持的报表类型: {api_name}")
+            field_catalog.validate(api_name, [name])
+        else:
+            api_name = next((api for api in STATEMENT_APIS if name in field_catalog.fields(api)), "")
+            if not api_name:
+                raise ValueError(f"财务报表不支持的字段: {name}")
+        if name not in STATEMENT_KEYS:
+            routed[api_name].append(name)
+    return routed
+
+
+async def financial_statements(
+    ts_code: str,
+    start_date: Optional[str] = "",
+    end_date: Optional[str] = "",
+    period: Optional[str] = "",
+    report_type: Optional[str] = "",
+    as_of: Optional[str] = "",
+    fields: Optional[list] = None,
+) -> dict:
+    """
+    Name:
+        上市公司三大财务报表（合并视图）。
+
+    Description:
+        同时获取利润表、资产负债表、现金流量表，按 (ts_code, end_date, report_type) 对齐为一张表，
+        每个报告期取最新的版本（指定as_of时取截至该日已公告的版本），对齐键只出现一次。
+
+    Args:
+        | 名称       | 类型   | 必选 | 描述                                                                 |
+        |------------|--------|------|----------------------------------------------------------------------|
+        | ts_code    | str    | 是    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写 |
+        | start_date | str    | 否    | 公告开始日期（YYYYMMDD格式）                                           |
+        | end_date   | str    | 否    | 公告结束日期 （YYYYMMDD格式）                                          |
+        | period     | str    | 否    | 报告期(每个季度最后一天的日期，比如20171231表示年报，20170630半年报，20170930三季报) |
+        | report_type| str    | 否    | 报告类型，参考income文档最下方说明                                     |
+        | as_of      | str    | 否    | 时点日期（YYYYMMDD格式），只返回截至该日已公告的数据 |
+        | fields     | list  | 否    | 从income、balancesheet、cashflow的Fields中选取需要查询的字段，同名字段默认取自排在前面的报表，也可以写成"cashflow.字段名"指定报表；不指定时返回三张报表的全部字段 |
+
+    """
+    try:
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
+
+        # 只请求包含所需字段的报表
+        routed = route_fields(list(dict.fromkeys(fields or [])))
+        apis = [api for api in STATEMENT_APIS if routed[api]] if fields else list(STATEMENT_APIS)
+        # 只请求对齐键时，从利润表获取
+        if not apis:
+            apis = ["income"]
+
+        params = dict(ts_code=ts_code, start_date=start_date, end_date=end_date, period=period, report_type=report_type, as_of=as_of)
+        loaders = {"income": income, "balancesheet": balancesheet, "cashflow": cashflow}
+        frames = await asyncio.gather(*[
+            loaders[api](**params, fields=STATEMENT_KEYS + routed[api] if fields else None)
+            for api in apis
+        ])
+
+        # 每个报告期只保留一个版本，按对齐键一次性横向拼接，重复的列只保留第一张报表中的
+        aligned = []
+        for api, df in zip(apis, frames):
+            if df is None or df.empty:
+                continue
+            df = as_of_filter(df, as_of or "99991231")
+            # 对齐键始终保留（接口未返回时按查询参数补齐）
+            df = df.assign(**{key: {"ts_code": ts_code, "report_type": report_type or "1"}.get(key, "")
+                              for key in STATEMENT_KEYS if key not in df})
+            keys = STATEMENT_KEYS
+            columns = [c for c in (routed[api] if fields else df.columns) if c in df and c not in STATEMENT_KEYS]
+            df = df.set_index(keys)[columns]
+            if aligned:
+                df = df[[c for c in df.columns if not any(c in prev.columns for prev in aligned)]]
+            aligned.append(df)
+
+        if not aligned:
+            return pd.DataFrame(columns=STATEMENT_KEYS + [f.rpartition(".")[2] for f in fields or []])
+
+        df = pd.concat(aligned, axis=1, join="outer").reset_index()
+        return df.sort_values("end_date", ascending=False, kind="stable").reset_index(drop=True)
+
+    except Exception as e:
+        logger.error(f"获取上市公司财务报表失败！\n ", exc_info=True)
+        raise Exception(f"获取上市公司财务报表失败！\n {str(e)}") from e
+
+
+# 未指定报告期时默认返回的季度数量
+DEFAULT_RATIO_QUARTERS = 12
+
+
+def list_periods(period: str, start_period: str, end_period: str) -> list:
+    """需要返回的报告期列表（YYYYMMDD）"""
+    if period:
+        return [standardize_date(p) for p in period.split(",") if p.strip()]
+    last = quarter_index([standardize_date(end_period) if end_period else pd.Timestamp.today().strftime("%Y%m%d")])[0]
+    # 报告期未结束的季度不计入
+    if not end_period:
+        last -= 1
+    first = quarter_index([standardize_date(start_period)])[0] if start_period else last - DEFAULT_RATIO_QUARTERS + 1
+    return quarter_end(np.arange(first, last + 1))
+
+
+async def load_ratio_statements(ts_code: str, as_of: str) -> dict:
+    """读取一支股票的三张报表（默认报告类型），每个报告期保留最新（或截至as_of）的版本"""
+    frames = await asyncio.gather(*[statement_store.get(api, ts_code) for api in STATEMENT_APIS])
+    return {api: as_of_filter(df, as_of or "99991231") for api, df in zip(STATEMENT_APIS, frames)}
+
+
+# 财务比率
+@register_fields(section="Ratios:")
+async def financial_ratios(
+    ts_code: str,
+    period: Optional[str] = "",
+    start_period: Optional[str] = "",
+    end_period: Optional[str] = "",
+    ratios: Optional[list] = None,
+    as_of: Optional[str] = "",
+) -> dict:
+    """
+    Name:
+        上市公司财务比率。
+
+    Description:
+        在服务端根据利润表、资产负债表、现金流量表批量计算多支股票、多个报告期的财务比率，
+        包括ROE、ROA、利润率、杠杆、自由现金流、TTM值及同比/环比增长；比率均为小数（不是百分数）。
+
+    Args:
+        | 名称         | 类型   | 必选 | 描述                                                                 |
+        |--------------|--------|------|----------------------------------------------------------------------|
+        | ts_code      | str    | 是    | 股票代码，多个股票用逗号分隔，也可以输入股票名称或拼音缩写 |
+        | period       | str    | 否    | 报告期，多个报告期用逗号分隔(每个季度最后一天的日期，比如20171231表示年报) |
+        | start_period | str    | 否    | 开始报告期，不指定报告期时默认为最近12个季度 |
+        | end_period   | str    | 否    | 结束报告期 |
+        | ratios       | list   | 否    | 从Ratios中选取需要计算的比率，不指定时返回全部比率 |
+        | as_of        | str    | 否    | 时点日期（YYYYMMDD格式），只使用截至该日已公告的报表计算 |
+
+    Ratios:
+        - roe：净资产收益率（TTM归母净利润/平均归母股东权益）
+        - roa：总资产收益率（TTM净利润/平均总资产）
+        - gross_margin：毛利率（(营业收入-营业成本)/营业收入，累计值）
+        - operating_margin：营业利润率（营业利润/营业收入，累计值）
+        - net_margin：净利率（归母净利润/营业收入，累计值）
+        - debt_to_assets：资产负债率（总负债/总资产）
+        - debt_to_equity：产权比率（总负债/归母股东权益）
+        - current_ratio：流动比率（流动资产/流动负债）
+        - fcf：自由现金流（经营活动现金流量净额-购建固定资产等支付的现金，累计值，元）
+        - fcf_ttm：自由现金流（TTM，元）
+        - revenue_ttm：营业收入（TTM，元）
+        - n_income_attr_p_ttm：归母净利润（TTM，元）
+        - revenue_yoy：营业收入同比增长（累计值）
+        - n_income_attr_p_yoy：归母净利润同比增长（累计值）
+        - revenue_qoq：单季营业收入环比增长
+        - n_income_attr_p_qoq：单季归母净利润环比增长
+        - eps_ttm：每股收益（TTM归母净利润/期末总股本，元）
+        - bvps：每股净资产（归母股东权益/期末总股本，元）
+        - fcf_per_share：每股自由现金流（TTM，元）
+    """
+    try:
+        ts_code = await normalize_ts_code(ts_code)
+        ts_codes = ts_code.split(",") if ts_code else []
+        if not ts_codes:
+            raise ValueError("请指定股票代码")
+
+        ratios = list(dict.fromkeys(ratios or [])) or list(RATIOS)
+        unknown = [r for r in ratios if r not in RATIOS]
+        if unknown:
+            raise ValueError(f"不支持的比率: {', '.join(unknown)}")
+
+        periods = list_periods(period, start_period, end_period)
+        if as_of:
+            as_of = standardize_date(as_of)
+
+        # 已计算过的比率直接读取（时点查询不使用缓存）
+        cached = [] if as_of else [ratio_store.get(p, ts_codes) for p in periods]
+        cached = [df for df in cached if not df.empty]
+        missing = set(ts_codes)
+        if cached and len(cached) == len(periods):
+            complete = set.intersection(*[set(df["ts_code"]) for df in cached])
+            missing -= complete
+
+        frames = cached if not missing else [df[~df["ts_code"].isin(missing)] for df in cached]
+        if missing:
+            # 计算同比与TTM需要历史报告期，按股票读取完整报表后一次性计算
+            statements = await asyncio.gather(*[load_ratio_statements(code, as_of) for code in sorted(missing)])
+            inputs = {
+                api: pd.concat([s[api] for s in statements if s[api] is not None and not s[api].empty] or [pd.DataFrame()], ignore_index=True)
+                for api in STATEMENT_APIS
+            }
+            computed = compute_ratios(inputs)
+            if not as_of and not computed.empty:
+                ratio_store.put(computed)
+            frames.append(computed[computed["end_date"].isin(set(periods))])
+
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=["ts_code", "end_date"] + ratios)
+        df = pd.concat(frames, ignore_index=True)
+        df = df[df["end_date"].isin(set(periods))][["ts_code", "end_date"] + ratios]
+        return df.sort_values(["ts_code", "end_date"], ascending=[True, False], kind="stable").reset_index(drop=True)
+
+    except Exception as e:
+        logger.error(f"计算上市公司财务比率失败！\n ", exc_info=True)
+        raise Exception(f"计算上市公司财务比率失败！\n {str(e)}") from e
+
+
+async def fetch_statement(api_name: str, ts_code: str, period: str, report_type: str, fields: list) -> pd.DataFrame:
+    """
+    获取一支股票一个报告期的报表：本地报表库未过期时直接读取，否则以批量优先级请求接口，失败时退避重试
+    """
+    if report_type in ("", "1"):
+        df = statement_store.cached(api_name, ts_code)
+        if df is not None:
+            return select_fields(filter_statements(df, period=period), fields)
+
+    for attempt in range(BULK_RETRIES + 1):
+        try:
+            return await query(api_name, priority=PRIORITY_BULK, ts_code=ts_code, period=period, report_type=report_type, fields=fields)
+        except Exception:
+            if attempt == BULK_RETRIES:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def bulk_universe(ts_code: str) -> list:
+    """批量任务的股票范围：指定的股票（已标准化），或全部上市股票"""
+    if ts_code:
+        ts_codes = ts_code.split(",")
+    else:
+        await security_master.ensure()
+        ts_codes = security_master.filter(list_status="L")["ts_code"].tolist()
+    if not ts_codes:
+        raise ValueError("没有需要查询的股票")
+    return ts_codes
+
+
+async def financial_bulk(
+    statement: str,
+    period: str,
+    ts_code: Optional[str] = "",
+    report_type: Optional[str] = "",
+    fields: Optional[list] = None,
+) -> dict:
+    """
+    Name:
+        上市公司财务报表（批量）。
+
+    Description:
+        按报告期批量获取多支股票（默认全部上市股票）的利润表、资产负债表或现金流量表，结果合并为一张表返回。
+        按接口配额并发获取，中途失败时已完成的部分会保存为断点，使用相同参数再次调用即可从断点继续。
+
+    Args:
+        | 名称       | 类型   | 必选 | 描述                                                                 |
+        |------------|--------|------|----------------------------------------------------------------------|
+        | statement  | str    | 是    | 报表类型（income：利润表，balancesheet：资产负债表，cashflow：现金流量表） |
+        | period     | str    | 是    | 报告期(每个季度最后一天的日期，比如20171231表示年报，20170630半年报，20170930三季报) |
+        | ts_code    | str    | 否    | 股票代码，多个股票用逗号分隔，也可以输入股票名称或拼音缩写；为空时为全部上市股票 |
+        | report_type| str    | 否    | 报告类型，参考income文档最下方说明                                     |
+        | fields     | list  | 否    | 从对应报表工具（income/balancesheet/cashflow）的Fields中选取需要查询的字段  |
+
+    """
+    try:
+        if statement not in STATEMENT_APIS:
+            raise ValueError(f"不支持的报表类型: {statement}，可选: {', '.join(STATEMENT_APIS)}")
+
+        period = standardize_date(period)
+
+        # 校验字段并添加股票代码和必须存在的字段
+        fields = field_catalog.projection(statement, fields, required=['ts_code', 'ann_date', 'f_ann_date', 'end_date'])
+
+        if ts_code:
+            ts_code = await normalize_ts_code(ts_code)
+
+        # 有权限时一次请求全市场
+        if USE_VIP_APIS:
+            ts_codes = await bulk_universe(ts_code)
+            df = await query(f"{statement}_vip", priority=PRIORITY_BULK, period=period, report_type=report_type, fields=fields)
+            if df is None or df.empty:
+                return pd.DataFrame(columns=fields or None)
+            df = df[df["ts_code"].isin(set(ts_codes))].reset_index(drop=True)
+            df.attrs["stocks"] = len(ts_codes)
+            return df
+
+        # 断点按请求参数区分，股票范围保存在断点中：恢复时沿用原来的范围，不受股票列表更新的影响
+        key = make_key(f"{statement}_bulk", {"period": period, "report_type": report_type, "ts_code": ts_code}, fields)
+        checkpoint = Checkpoint(get_cache_dir("checkpoints", key), flush_every=CHECKPOINT_EVERY)
+        checkpoint.load()
+        if not checkpoint.universe:
+            checkpoint.universe = await bulk_universe(ts_code)
+            checkpoint.flush(force=True)
+        ts_codes = checkpoint.universe
+        pending = [code for code in ts_codes if code not in checkpoint.done]
+
+        async def fetch(code):
+            try:
+                checkpoint.add(code, await fetch_statement(statement, code, period, report_type, fields))
+                return None
+            except Exception as e:
+                logger.warning(f"获取{code} {statement}失败: {e}")
+                return code
+
+        # 分批执行，每批完成后保存断点，同时只有一批任务在排队
+        failed = []
+        for start in range(0, len(pending), CHECKPOINT_EVERY):
+            batch = pending[start:start + CHECKPOINT_EVERY]
+            failed.extend(code for code in await asyncio.gather(*[fetch(code) for code in batch]) if code)
+            checkpoint.flush()
+
+        if failed:
+            raise Exception(
+                f"{len(failed)}支股票获取失败（如 {', '.join(failed[:5])}），"
+                f"已完成的{len(checkpoint.done)}支股票已保存断点，使用相同参数再次调用即可继续"
+            )
+
+        frames = checkpoint.result()
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=fields or None)
+        checkpoint.clear()
+
+        df.attrs["stocks"] = len(ts_codes)
+        df.attrs["resumed"] = len(ts_codes) - len(pending)
+        return df
+
+    except Exception as e:
+        logger.error(f"批量获取上市公司财务报表失败！\n ", exc_info=True)
+        raise Exception(f"批量获取上市公司财务报表失败！\n {str(e)}") from e
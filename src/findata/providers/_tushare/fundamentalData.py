@@ -1,13 +1,20 @@
 import os
+import asyncio
 import pandas as pd
 from typing import Optional
 from utils.date_processor import standardize_date
-from .common import get_trade_dates
-from utils.auth import login
+from utils.field_catalog import field_catalog, register_fields
+from .common import get_trade_date_array, query, split_trade_dates
+from .securityMaster import normalize_ts_code, security_master
+from .tradeCalendar import sorted_contains, to_datetime64_array
 from utils.findata_log import setup_logger
 
 logger = setup_logger()
 
+# bak_basic 每批次包含的交易日数量
+BAK_BASIC_BATCH_DAYS = int(os.getenv("FINDATA_BAK_BASIC_BATCH_DAYS", "250"))
+
+@register_fields()
 async def stock_basic(
     ts_code: Optional[str] = "",
     name: Optional[str] = "",
@@ -15,7 +22,7 @@ async def stock_basic(
     list_status: Optional[str] = "",
     exchange: Optional[str] = "",
     is_hs: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -27,7 +34,7 @@ async def stock_basic(
     Args:
         | 名称       | 类型  | 必填 | 描述                                   |
         |------------|-------|------|----------------------------------------|
-        | ts_code    | str   | 否    | 股票代码，每次只能查询一支股票    |
+        | ts_code    | str   | 否    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写    |
         | name       | str   | 否    | 股票名称 |
         | market     | str   | 否    | 市场类别 （主板/创业板/科创板/CDR/北交所） |
         | list_status    | str   | 否    | 上市状态（L：上市，D：退市，P：暂停上市。默认是L） |
@@ -56,13 +63,19 @@ async def stock_basic(
     """
     try:
         logger.debug("call stock basic!")
-        # 登录tushare
-        tsObj = login()
 
-        #TODO 股票代码 标准化
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
             
-        df = tsObj.stock_basic(ts_code=ts_code, name=name, market=market, list_status=list_status, exchange=exchange, is_hs=is_hs, fields=fields)
-        # return df.to_json()
+        fields = field_catalog.projection("stock_basic", fields)
+
+        # 优先从本地证券主表筛选
+        await security_master.ensure()
+        if security_master.is_fresh() and set(fields) <= set(security_master.df.columns):
+            df = security_master.filter(ts_code=ts_code, name=name, market=market, list_status=list_status, exchange=exchange, is_hs=is_hs)
+            return df[fields] if fields else df
+
+        df = await query("stock_basic", ts_code=ts_code, name=name, market=market, list_status=list_status, exchange=exchange, is_hs=is_hs, fields=fields)
         return df
     
     except Exception as e:
@@ -70,10 +83,11 @@ async def stock_basic(
         raise Exception(f"获取股票基本信息失败！\n {str(e)}") from e
 
 
+@register_fields()
 async def stock_company(
     ts_code: Optional[str] = "",
     exchange: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -85,7 +99,7 @@ async def stock_company(
     Args:
         | 名称       | 类型  | 必填 | 描述                                   |
         |------------|-------|------|----------------------------------------|
-        | ts_code    | str   | 否    | 股票代码，每次只能查询一家公司    |
+        | ts_code    | str   | 否    | 股票代码，每次只能查询一家公司，也可以输入股票名称或拼音缩写    |
         | exchange   | str   | 否    | 交易所代码 (上交所：SSE， 深交所：SZSE  北交所：BSE) |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段  |
 
@@ -111,13 +125,12 @@ async def stock_company(
 
     """
     try:
-        # 登录tushare
-        tsObj = login()
-
-        #TODO 股票代码 标准化
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
             
-        df = tsObj.stock_company(ts_code=ts_code, exchange=exchange, fields=fields)
-        # return df.to_json()
+        fields = field_catalog.projection("stock_company", fields)
+
+        df = await query("stock_company", ts_code=ts_code, exchange=exchange, fields=fields)
         return df
     
     except Exception as e:
@@ -127,11 +140,12 @@ async def stock_company(
 
 
 
+@register_fields()
 async def bak_basic(
     ts_code: str,
     start_date: str,
     end_date: str,
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -143,7 +157,7 @@ async def bak_basic(
     Args:
         | 名称       | 类型  | 必填 | 描述                                   |
         |------------|-------|------|----------------------------------------|
-        | ts_code    | str   | 是    | 股票代码，每次只能查询一支股票    |
+        | ts_code    | str   | 是    | 股票代码，每次只能查询一支股票，也可以输入股票名称或拼音缩写    |
         | start_date | str   | 是    | 开始日期（YYYYMMDD） |
         | end_date | str   | 是    | 开始日期（YYYYMMDD） |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段  |
@@ -176,32 +190,37 @@ async def bak_basic(
 
     """
     try:
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         start_date = standardize_date(start_date)
 
         end_date = standardize_date(end_date)
 
-        #TODO 股票代码 标准化
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
 
         # 获取指定时间范围内的交易日
-        trade_dates = get_trade_dates(start_date=start_date, end_date=end_date)
+        trade_dates = await get_trade_date_array(start_date=start_date, end_date=end_date)
 
-        if not trade_dates:
+        if not len(trade_dates):
             raise ValueError(f"指定的时间范围内，没有交易日")
 
-        # 查询单支股票所有的基本面数据    
-        if  fields:
-            fields.append('trade_date')
-            fields = list(set(fields))
+        fields = field_catalog.projection("bak_basic", fields, required=['trade_date'])
+
+        # 按交易日分批，将日期范围下推到接口，并发获取后合并
+        # 接口按交易日降序返回，批次从最近的开始拼接，与一次性查询的顺序一致
+        batches = split_trade_dates(trade_dates, BAK_BASIC_BATCH_DAYS)[::-1]
+        frames = await asyncio.gather(*[
+            query("bak_basic", ts_code=ts_code, start_date=batch_start, end_date=batch_end, fields=fields)
+            for batch_start, batch_end in batches
+        ])
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=fields or None)
 
-        df = tsObj.bak_basic(ts_code=ts_code, fields=fields)
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
 
-        res = df[df['trade_date'].isin(trade_dates)]
+        res = df[sorted_contains(trade_dates, to_datetime64_array(df['trade_date']))]
 
-        # return res.to_json()
         return res
     
     except Exception as e:
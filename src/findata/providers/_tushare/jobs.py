@@ -0,0 +1,69 @@
+import os
+from datetime import datetime, timedelta
+from utils.findata_log import setup_logger
+from .dailyStore import daily_store
+from .macroStore import MACRO_KEYS, macro_store
+from .securityMaster import security_master
+from .snapshotStore import daily_snapshots, is_closed
+from .statementStore import statement_store
+from .tradeCalendar import get_calendar, to_date_str
+
+logger = setup_logger()
+
+# 收盘后预取日线与财务报表的股票（逗号分隔）
+PREFETCH_CODES = [code.strip().upper() for code in os.getenv("FINDATA_PREFETCH_CODES", "").split(",") if code.strip()]
+
+# 预取日线的天数
+PREFETCH_DAYS = int(os.getenv("FINDATA_PREFETCH_DAYS", "365"))
+
+
+async def refresh_trade_calendar():
+    await get_calendar().refresh()
+
+
+async def refresh_security_master():
+    await security_master.ensure()
+
+
+async def prefetch_daily_snapshot():
+    """保存最近一个已收盘交易日的全市场日线截面"""
+    calendar = get_calendar()
+    today = datetime.now().strftime("%Y%m%d")
+    await calendar.ensure(today, today)
+    last = calendar.previous_trading_day(today, include=True)
+    if last is None:
+        return
+    trade_date = to_date_str([last])[0]
+    if not is_closed(trade_date):
+        last = calendar.previous_trading_day(trade_date)
+        if last is None:
+            return
+        trade_date = to_date_str([last])[0]
+    if not daily_snapshots.is_cached(trade_date):
+        await daily_snapshots.get(trade_date)
+        logger.info(f"已预取{trade_date}全市场日线")
+
+
+async def prefetch_watchlist():
+    """同步关注股票的日线与财务报表"""
+    end = datetime.now()
+    start = (end - timedelta(days=PREFETCH_DAYS)).strftime("%Y%m%d")
+    for ts_code in PREFETCH_CODES:
+        await daily_store.get(ts_code, start, end.strftime("%Y%m%d"))
+        for api_name in ("income", "balancesheet", "cashflow"):
+            await statement_store.get(api_name, ts_code)
+
+
+async def refresh_macro():
+    """宏观序列只在发布日之后才会真正访问接口"""
+    for api_name in MACRO_KEYS:
+        await macro_store.get(api_name)
+
+
+def register_jobs(scheduler):
+    """注册后台任务及默认的触发方式，可通过环境变量 FINDATA_SCHEDULE 覆盖"""
+    scheduler.add("trade_calendar", refresh_trade_calendar, "startup")
+    scheduler.add("security_master", refresh_security_master, "startup")
+    scheduler.add("daily_snapshot", prefetch_daily_snapshot, "17:30")
+    scheduler.add("watchlist", prefetch_watchlist, "18:00" if PREFETCH_CODES else "off")
+    scheduler.add("macro", refresh_macro, "3600")
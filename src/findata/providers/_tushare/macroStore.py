@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.findata_log import setup_logger
+from .cachePolicy import next_release
+
+logger = setup_logger()
+
+# 各宏观接口的期间字段
+MACRO_KEYS = {
+    "shibor_lpr": "date",
+    "cn_gdp": "quarter",
+    "cn_cpi": "month",
+    "cn_ppi": "month",
+    "cn_m": "month",
+    "sf_month": "month",
+    "cn_pmi": "month",
+}
+
+# 各宏观接口的查询参数：(单个或逗号分隔的期间, 开始期间, 结束期间)
+MACRO_PARAMS = {
+    "shibor_lpr": ("date", "start_date", "end_date"),
+    "cn_gdp": ("q", "start_q", "end_q"),
+}
+MONTH_PARAMS = ("m", "start_m", "end_m")
+
+# 增量刷新时重新获取的最近期数（覆盖对近期数据的修订）
+REFRESH_PERIODS = int(os.getenv("FINDATA_MACRO_REFRESH_PERIODS", "3"))
+
+# 发布日之后新数据尚未出现时的重试间隔（秒）
+RETRY_INTERVAL = int(os.getenv("FINDATA_MACRO_RETRY_INTERVAL", "21600"))
+
+
+def macro_params(api_name: str) -> tuple:
+    return MACRO_PARAMS.get(api_name, MONTH_PARAMS)
+
+
+class MacroSeries:
+    """一个宏观序列：按期间升序的数据及期间数组"""
+    def __init__(self, df: pd.DataFrame, key: str, synced_at: float = 0.0, next_refresh: float = 0.0):
+        self.key = key
+        self.df = df.sort_values(key, kind="stable").reset_index(drop=True) if not df.empty else df
+        self.keys = self.df[key].astype(str).to_numpy() if not df.empty else np.array([], dtype=str)
+        self.synced_at = synced_at
+        self.next_refresh = next_refresh
+
+    def latest(self) -> str:
+        return self.keys[-1] if len(self.keys) else ""
+
+
+class MacroStore:
+    """
+    宏观数据本地序列
+
+    每个宏观接口的完整序列保存为一个本地列式文件并常驻内存，
+    单个/多个期间与区间查询都通过对升序期间数组的二分查找在内存中切片；
+    只在发布日之后重新获取最近几期（新数据尚未发布时定期重试），平时不访问网络。
+    """
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._series = {}
+        self._locks = {}
+
+    def _paths(self, api_name: str):
+        base = os.path.join(self.store_dir, api_name)
+        return base + FRAME_SUFFIX, base + ".json"
+
+    def _lock(self, api_name: str) -> asyncio.Lock:
+        lock = self._locks.get(api_name)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[api_name] = lock
+        return lock
+
+    def load(self, api_name: str):
+        frame_path, meta_path = self._paths(api_name)
+        if not (os.path.exists(frame_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return MacroSeries(read_frame(frame_path), MACRO_KEYS[api_name], meta["synced_at"], meta["next_refresh"])
+        except Exception:
+            logger.warning(f"读取本地{api_name}失败，将重新下载", exc_info=True)
+            return None
+
+    def save(self, api_name: str, series: MacroSeries):
+        frame_path, meta_path = self._paths(api_name)
+        write_frame(series.df, frame_path)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"synced_at": series.synced_at, "next_refresh": series.next_refresh}, f)
+        os.replace(tmp_path, meta_path)
+
+    async def refresh(self, api_name: str, series: MacroSeries = None) -> MacroSeries:
+        """
+        同步序列：本地没有数据时下载完整序列，否则只重新获取最近几期
+        """
+        from .common import query
+
+        key = MACRO_KEYS[api_name]
+        params = {}
+        if series is not None and len(series.keys):
+            _, start_param, _ = macro_params(api_name)
+            params[start_param] = series.keys[max(len(series.keys) - REFRESH_PERIODS, 0)]
+
+        new = await query(api_name, cache=False, **params)
+        frames = [df for df in (series.df if series is not None else None, new) if df is not None and not df.empty]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[key])
+        if not df.empty:
+            df[key] = df[key].astype(str)
+            df = df.drop_duplicates(subset=[key], keep="last")
+
+        now = datetime.now()
+        refreshed = MacroSeries(df, key, synced_at=time.time())
+        # 新一期数据尚未发布时稍后重试，否则等到下一个发布日
+        if series is not None and refreshed.latest() == series.latest():
+            refreshed.next_refresh = min(next_release(api_name, now).timestamp(), time.time() + RETRY_INTERVAL)
+        else:
+            refreshed.next_refresh = next_release(api_name, now).timestamp()
+        logger.debug(f"同步{api_name}: {params or '完整序列'}，最新一期{refreshed.latest()}")
+        return refreshed
+
+    async def get(self, api_name: str) -> MacroSeries:
+        """返回内存中的序列，需要时从本地读取或同步"""
+        series = self._series.get(api_name)
+        if series is not None and time.time() < series.next_refresh:
+            return series
+
+        async with self._lock(api_name):
+            series = self._series.get(api_name) or self.load(api_name)
+            if series is None or time.time() >= series.next_refresh:
+                try:
+                    series = await self.refresh(api_name, series)
+                    self.save(api_name, series)
+                except Exception:
+                    if series is None:
+                        raise
+                    # 同步失败时继续使用本地数据
+                    logger.warning(f"同步{api_name}失败，使用本地数据", exc_info=True)
+                    series.next_refresh = time.time() + 300
+            self._series[api_name] = series
+            return series
+
+    def slice(self, series: MacroSeries, api_name: str, params: dict) -> pd.DataFrame:
+        """按期间参数在内存中切片，结果按期间降序"""
+        single, start_param, end_param = macro_params(api_name)
+        keys = series.keys
+        if params.get(single):
+            wanted = [p.strip().upper() for p in str(params[single]).split(",") if p.strip()]
+            idx = np.flatnonzero(np.isin(keys, wanted))
+        else:
+            left = np.searchsorted(keys, str(params[start_param]).strip().upper(), side="left") if params.get(start_param) else 0
+            right = np.searchsorted(keys, str(params[end_param]).strip().upper(), side="right") if params.get(end_param) else len(keys)
+            idx = np.arange(left, right)
+        return series.df.iloc[idx[::-1]].reset_index(drop=True)
+
+    async def query(self, api_name: str, fields: list = None, **params) -> pd.DataFrame:
+        series = await self.get(api_name)
+        df = self.slice(series, api_name, params)
+        if fields:
+            df = df[[c for c in fields if c in df.columns]]
+        return df
+
+    def stats(self) -> dict:
+        return {
+            api_name: {"periods": len(series.keys), "latest": series.latest(), "next_refresh": series.next_refresh}
+            for api_name, series in self._series.items()
+        }
+
+
+macro_store = MacroStore(get_cache_dir("macro"))
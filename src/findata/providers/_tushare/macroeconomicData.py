@@ -1,15 +1,22 @@
 import os
+import asyncio
 import pandas as pd
 from typing import Optional
 from utils.date_processor import standardize_date
-from utils.auth import login
+from utils.field_catalog import field_catalog, register_fields
+from .macroStore import MACRO_KEYS, macro_store
+
+# 目标频率对应的期间格式
+PANEL_FREQS = {"D": "%Y%m%d", "M": "%Y%m", "Q": "Q"}
+PANEL_HOWS = ("last", "mean")
 
 
 # LPR
+@register_fields()
 async def shibor_lpr(
     start_date: Optional[str] = "",
     end_date: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     
     """
@@ -33,9 +40,6 @@ async def shibor_lpr(
 
     """
     try:
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         if start_date:
             start_date = standardize_date(start_date)
@@ -44,22 +48,22 @@ async def shibor_lpr(
             end_date = standardize_date(end_date)
 
 
-        #TODO 股票代码 标准化
-        
             
-        df = tsObj.shibor_lpr(start_date=start_date, end_date=end_date, fields=fields)
-        # return df.to_json()
+        fields = field_catalog.projection("shibor_lpr", fields)
+
+        df = await macro_store.query("shibor_lpr", start_date=start_date, end_date=end_date, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取LPR贷款基础利率失败！\n {str(e)}") from e
 
 
 # GDP
+@register_fields()
 async def cn_gdp(
     q: Optional[str] = "",
     start_q: Optional[str] = "",
     end_q: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     
     """
@@ -90,26 +94,21 @@ async def cn_gdp(
 
     """
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加季度字段
+        fields = field_catalog.projection("cn_gdp", fields, required=['quarter'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('quarter')
-            fields = list(set(fields))
-            
-        df = tsObj.cn_gdp(q=q, start_q=start_q, end_q=end_q, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("cn_gdp", q=q, start_q=start_q, end_q=end_q, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取GDP数据失败！\n {str(e)}") from e
 
 # CPI
+@register_fields()
 async def cn_cpi(
     m: Optional[str] = "",
     start_m: Optional[str] = "",
     end_m: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -142,26 +141,21 @@ async def cn_cpi(
         - cnt_accu: 农村累计值
     """
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加月份字段
+        fields = field_catalog.projection("cn_cpi", fields, required=['month'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('month')
-            fields = list(set(fields))
-            
-        df = tsObj.cn_cpi(m=m, start_m=start_m, end_m=end_m, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("cn_cpi", m=m, start_m=start_m, end_m=end_m, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取CPI数据失败！\n {str(e)}") from e
 
 # PPI
+@register_fields()
 async def cn_ppi(
     m: Optional[str] = "",
     start_m: Optional[str] = "",
     end_m: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -215,27 +209,22 @@ async def cn_ppi(
     """
 
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加月份字段
+        fields = field_catalog.projection("cn_ppi", fields, required=['month'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('month')
-            fields = list(set(fields))
-            
-        df = tsObj.cn_ppi(m=m, start_m=start_m, end_m=end_m, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("cn_ppi", m=m, start_m=start_m, end_m=end_m, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取PPI数据失败！\n {str(e)}") from e
 
 
 # 货币供应量
+@register_fields()
 async def cn_m(
     m: Optional[str] = "",
     start_m: Optional[str] = "",
     end_m: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -265,27 +254,22 @@ async def cn_m(
         - m2_mom: M2环比（%）
     """
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加月份字段
+        fields = field_catalog.projection("cn_m", fields, required=['month'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('month')
-            fields = list(set(fields))
-            
-        df = tsObj.cn_m(m=m, start_m=start_m, end_m=end_m, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("cn_m", m=m, start_m=start_m, end_m=end_m, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取货币供应量数据失败！\n {str(e)}") from e
 
 
 # 社融数据（月度）
+@register_fields()
 async def sf_month(
     m: Optional[str] = "",
     start_m: Optional[str] = "",
     end_m: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -309,26 +293,21 @@ async def sf_month(
         - stk_endval: 社融存量期末值（万亿元）
     """
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加月份字段
+        fields = field_catalog.projection("sf_month", fields, required=['month'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('month')
-            fields = list(set(fields))
-            
-        df = tsObj.sf_month(m=m, start_m=start_m, end_m=end_m, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("sf_month", m=m, start_m=start_m, end_m=end_m, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取社融数据数据失败！\n {str(e)}") from e
 
 # pmi
+@register_fields()
 async def cn_pmi(
     m: Optional[str] = "",
     start_m: Optional[str] = "",
     end_m: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
 ) -> dict:
     """
     Name:
@@ -409,18 +388,110 @@ async def cn_pmi(
     """
 
     try:
-        # 登录tushare
-        tsObj = login()
+        # 校验字段并添加月份字段
+        fields = field_catalog.projection("cn_pmi", fields, required=['month'])
 
-        # 添加季度字段
-        if  fields:
-            fields.append('month')
-            fields = list(set(fields))
-            
-        df = tsObj.cn_pmi(m=m, start_m=start_m, end_m=end_m, fields=fields)
-        # return df.to_json()
+        df = await macro_store.query("cn_pmi", m=m, start_m=start_m, end_m=end_m, fields=fields)
         return df
     except Exception as e:
         raise Exception(f"获取PMI数据失败！\n {str(e)}") from e
 
 
+def series_periods(api_name: str, keys: pd.Series, freq: str) -> pd.PeriodIndex:
+    """将宏观序列的期间（YYYYMMDD、YYYYMM、YYYYQn）转换为目标频率的期间"""
+    keys = keys.astype(str)
+    if MACRO_KEYS[api_name] == "quarter":
+        periods = pd.PeriodIndex(keys.str.upper(), freq="Q")
+    elif MACRO_KEYS[api_name] == "month":
+        periods = pd.PeriodIndex(pd.to_datetime(keys, format="%Y%m").dt.to_period("M"))
+    else:
+        periods = pd.PeriodIndex(pd.to_datetime(keys, format="%Y%m%d").dt.to_period("D"))
+    return periods.asfreq(freq, how="end")
+
+
+def parse_panel_series(series: list) -> dict:
+    """解析 ["cn_gdp.gdp_yoy", "cn_cpi"] 形式的序列列表，返回 {接口: 字段列表}，字段为空表示全部字段"""
+    requested = {}
+    for item in series:
+        api_name, _, field = str(item).strip().partition(".")
+        if api_name not in MACRO_KEYS:
+            raise ValueError(f"不支持的宏观序列: {api_name}，可选: {', '.join(MACRO_KEYS)}")
+        fields = requested.setdefault(api_name, [])
+        if field:
+            fields.extend(field_catalog.validate(api_name, [field]))
+    return requested
+
+
+async def macro_panel(
+    series: list,
+    freq: Optional[str] = "M",
+    start_date: Optional[str] = "",
+    end_date: Optional[str] = "",
+    how: Optional[str] = "last",
+) -> dict:
+    """
+    Name:
+        宏观数据对齐面板。
+
+    Description:
+        将不同频率的宏观序列（季度GDP、月度CPI/PPI/货币供应量/社融/PMI、LPR）对齐到同一频率，返回一张表。
+        高频序列按how汇总到目标频率；低频序列在每个目标期间取截至该期末已有的最新值（as-of）。
+
+    Args:
+        | 名称       | 类型  | 必填 | 描述                                   |
+        |------------|-------|------|----------------------------------------|
+        | series     | list  | 是    | 序列列表，格式为"接口.字段"（如cn_gdp.gdp_yoy、cn_cpi.nt_yoy、shibor_lpr.1y），只写接口名时包含该接口的全部字段 |
+        | freq       | str   | 否    | 目标频率（D：日，M：月，Q：季），默认M |
+        | start_date | str   | 否    | 开始日期（YYYYMMDD），默认为各序列共同覆盖的最早日期 |
+        | end_date   | str   | 否    | 结束日期（YYYYMMDD），默认为今天 |
+        | how        | str   | 否    | 高频序列汇总方式（last：期末值，mean：平均值），默认last |
+
+    """
+    try:
+        freq = (freq or "M").upper()
+        if freq not in PANEL_FREQS:
+            raise ValueError(f"不支持的频率: {freq}，可选: {', '.join(PANEL_FREQS)}")
+        if how not in PANEL_HOWS:
+            raise ValueError(f"不支持的汇总方式: {how}，可选: {', '.join(PANEL_HOWS)}")
+
+        requested = parse_panel_series(series or [])
+        if not requested:
+            raise ValueError("请指定宏观序列")
+
+        frames = await asyncio.gather(*[macro_store.query(api_name) for api_name in requested])
+
+        # 每个序列先汇总到目标频率，再按共同的期间索引对齐并向后填充（as-of）
+        columns, starts = {}, []
+        for (api_name, fields), df in zip(requested.items(), frames):
+            key = MACRO_KEYS[api_name]
+            if df is None or df.empty:
+                continue
+            # 本地序列按期间降序返回，汇总前改为升序，last 才是期末值
+            df = df.sort_values(key, kind="stable")
+            fields = [c for c in (fields or df.columns) if c != key and c in df]
+            values = df[fields].apply(pd.to_numeric, errors="coerce")
+            values.index = series_periods(api_name, df[key], freq)
+            values = values.groupby(level=0).agg(how).sort_index()
+            starts.append(values.index[0])
+            for field in fields:
+                name = field if field not in columns else f"{api_name}.{field}"
+                columns[name] = values[field]
+
+        if not columns:
+            return pd.DataFrame(columns=["period"])
+
+        end = pd.Period(pd.Timestamp(standardize_date(end_date)) if end_date else pd.Timestamp.today(), freq=freq)
+        start = pd.Period(pd.Timestamp(standardize_date(start_date)), freq=freq) if start_date else max(starts)
+        first = min(min(starts), start)
+        index = pd.period_range(first, end, freq=freq)
+
+        panel = pd.DataFrame({name: s.reindex(index.union(s.index)).ffill().reindex(index) for name, s in columns.items()})
+        panel = panel.loc[start:end]
+
+        period_format = PANEL_FREQS[freq]
+        labels = panel.index.astype(str) if period_format == "Q" else panel.index.strftime(period_format)
+        panel.insert(0, "period", labels)
+        return panel.iloc[::-1].reset_index(drop=True)
+
+    except Exception as e:
+        raise Exception(f"获取宏观数据对齐面板失败！\n {str(e)}") from e
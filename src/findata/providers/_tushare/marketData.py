@@ -1,16 +1,37 @@
 import os
+import asyncio
 import pandas as pd
 from typing import Optional
 from utils.date_processor import standardize_date
-from utils.auth import login
+from utils.findata_log import setup_logger
+from utils.rate_limiter import PRIORITY_BULK
+from utils.field_catalog import field_catalog, register_fields
+from .common import BULK_RETRIES, get_trade_date_array, query, select_fields, split_trade_dates
+from .securityMaster import normalize_ts_code
+from .dailyStore import daily_store
+from .snapshotStore import daily_snapshots, use_snapshots
+from .tradeCalendar import get_calendar, to_datetime64_array, to_date_str
 
+logger = setup_logger()
 
+# daily 接口单次返回的最大行数
+DAILY_ROW_LIMIT = int(os.getenv("FINDATA_DAILY_ROW_LIMIT", "6000"))
+
+# daily 接口单次请求的最大股票数量
+DAILY_MAX_CODES = int(os.getenv("FINDATA_DAILY_MAX_CODES", "200"))
+
+
+@register_fields()
 async def daily(
     ts_code: Optional[str] = "",
     trade_date: Optional[str] = "",
     start_date: Optional[str] = "",
     end_date: Optional[str] = "",
-    fields: Optional[list] = [],
+    fields: Optional[list] = None,
+    resample: Optional[str] = "",
+    aggregate: Optional[str] = "",
+    top_n: Optional[int] = 0,
+    sort_by: Optional[str] = "pct_chg",
 ) -> dict:
     
     """
@@ -18,16 +39,20 @@ async def daily(
         A股日线行情。
 
     Description:
-        获取股票未复权的日线行情数据。
+        获取股票未复权的日线行情数据，支持在服务端汇总为周/月/季线、计算统计值或筛选排名靠前的记录。
 
     Args:
         | 名称       | 类型  | 必填 | 描述                                   |
         |------------|-------|------|----------------------------------------|
-        | ts_code    | str   | 否    | 股票代码（支持多个股票同时提取，逗号分隔） |
+        | ts_code    | str   | 否    | 股票代码（支持多个股票同时提取，逗号分隔），也可以输入股票名称或拼音缩写 |
         | trade_date | str   | 否    | 交易日期（YYYYMMDD），不与start_date和end_date同时出现 |
         | start_date | str   | 否    | 开始日期（YYYYMMDD），与end_date同时出现 |
         | end_date   | str   | 否    | 结束日期（YYYYMMDD），与start_date同时出现  |
         | fields     | list  | 否    | 从Fields中选取需要查询的字段  |
+        | resample   | str   | 否    | 汇总周期（W：周线，M：月线，Q：季线），按开高低收、成交量/额求和的方式汇总 |
+        | aggregate  | str   | 否    | 统计方式（mean/min/max/last），与resample同时使用时按周期统计，单独使用时按股票统计整个区间 |
+        | top_n      | int   | 否    | 只返回按sort_by从大到小排序的前N条记录 |
+        | sort_by    | str   | 否    | top_n的排序字段，默认pct_chg |
 
     Fields:
         - ts_code: 股票代码
@@ -44,9 +69,6 @@ async def daily(
 
     """
     try:       
-        # 登录tushare
-        tsObj = login()
-
         # 日期标准化
         if trade_date:
             trade_date = standardize_date(trade_date)
@@ -58,18 +80,301 @@ async def daily(
             end_date = standardize_date(end_date)
 
 
-        #TODO 股票代码 标准化
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
+
+
+        # 校验字段并添加交易日
+        required = ['trade_date']
+        if resample or aggregate:
+            required.append('ts_code')
+        if top_n and sort_by:
+            required.extend(field_catalog.validate("daily", [sort_by]))
+        fields = field_catalog.projection("daily", fields, required=required)
+
+        df = await load_daily(ts_code, trade_date, start_date, end_date, fields)
 
+        # 服务端汇总与筛选
+        if resample:
+            df = resample_daily(df, resample, aggregate)
+        elif aggregate:
+            df = aggregate_daily(df, aggregate)
+
+        if top_n:
+            df = top_n_rows(df, top_n, sort_by)
 
-        # 添加交易日
-        if  fields:
-            fields.append('trade_date')
-            fields = list(set(fields))
-        
-            
-        df = tsObj.daily(ts_code=ts_code, trade_date=trade_date, start_date=start_date, end_date=end_date, fields=fields)
         return df
-        # return df.to_json()
     except Exception as e:
         raise Exception(f"获取股票日线行情数据失败！\n {str(e)}") from e
 
+
+async def load_daily(ts_code: str, trade_date: str, start_date: str, end_date: str, fields: list) -> pd.DataFrame:
+    """
+    获取日线：根据成本模型选择全市场截面、本地日线或直接请求接口
+    """
+    ts_codes = [code.strip().upper() for code in ts_code.split(",") if code.strip()] if ts_code else []
+
+    # 按交易日查询：全市场直接使用截面，部分股票由成本模型决定是否从截面切片
+    if trade_date and not start_date and not end_date:
+        if not ts_codes:
+            return select_fields(await daily_snapshots.get(trade_date), fields)
+        trade_dates = to_datetime64_array([trade_date])
+        if use_snapshots(len(ts_codes), trade_dates, calls=1, rows=len(ts_codes)):
+            return select_fields(await daily_snapshots.slice(ts_codes, [trade_date]), fields)
+
+    # 按日期区间查询：由成本模型在截面切片与按股票请求之间选择
+    if ts_codes and start_date and end_date and not trade_date:
+        trade_dates = await get_trade_date_array(start_date=start_date, end_date=end_date)
+        if len(ts_codes) == 1:
+            gaps = daily_store.gaps(ts_codes[0], trade_dates)
+            calls = len(gaps)
+            rows = sum(len(get_calendar().range(gap_start, gap_end)) for gap_start, gap_end in gaps)
+        else:
+            calls = len(plan_daily_chunks(ts_codes, trade_dates))
+            rows = len(ts_codes) * len(trade_dates)
+
+        if use_snapshots(len(ts_codes), trade_dates, calls=calls, rows=rows):
+            df = await daily_snapshots.slice(ts_codes, to_date_str(trade_dates))
+        elif len(ts_codes) == 1:
+            # 单支股票使用本地日线，只补齐缺失的交易日
+            df = await daily_store.get(ts_codes[0], start_date, end_date)
+        else:
+            df, _ = await fetch_daily_range(ts_codes, trade_dates, fields)
+        return select_fields(df, fields)
+
+    return await query("daily", ts_code=ts_code, trade_date=trade_date, start_date=start_date, end_date=end_date, fields=fields)
+
+
+# 日线汇总为周/月/季线时各字段的计算方式
+OHLCV_AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "pre_close": "first",
+    "vol": "sum",
+    "amount": "sum",
+}
+
+RESAMPLE_FREQ = {"W": "W", "M": "M", "Q": "Q"}
+AGGREGATE_FUNCS = ("mean", "min", "max", "last")
+
+
+def _group_keys(df: pd.DataFrame) -> list:
+    return ["ts_code"] if "ts_code" in df.columns else []
+
+
+def _check_aggregate(aggregate: str):
+    if aggregate not in AGGREGATE_FUNCS:
+        raise ValueError(f"不支持的统计方式: {aggregate}，可选: {', '.join(AGGREGATE_FUNCS)}")
+
+
+def resample_daily(df: pd.DataFrame, resample: str, aggregate: str = "") -> pd.DataFrame:
+    """
+    将日线汇总为周/月/季线；未指定 aggregate 时按开高低收、成交量/额求和汇总，
+    指定时对各数值字段按周期统计；trade_date 为周期内最后一个交易日
+    """
+    freq = RESAMPLE_FREQ.get(resample.upper())
+    if freq is None:
+        raise ValueError(f"不支持的汇总周期: {resample}，可选: W、M、Q")
+    if df.empty:
+        return df
+
+    df = df.sort_values("trade_date", kind="stable")
+    keys = _group_keys(df)
+    period = pd.to_datetime(df["trade_date"], format="%Y%m%d").dt.to_period(freq).rename("period")
+    numeric = [c for c in df.select_dtypes("number").columns]
+
+    if aggregate:
+        _check_aggregate(aggregate)
+        rules = {column: aggregate for column in numeric}
+    else:
+        rules = {column: rule for column, rule in OHLCV_AGG.items() if column in df.columns}
+    rules["trade_date"] = "last"
+
+    res = df.groupby(keys + [period], sort=True).agg(rules).reset_index()
+
+    # 涨跌额与涨跌幅按周期首尾重新计算
+    if not aggregate and {"close", "pre_close"} <= set(res.columns):
+        if "change" in df.columns:
+            res["change"] = res["close"] - res["pre_close"]
+        if "pct_chg" in df.columns:
+            res["pct_chg"] = (res["close"] - res["pre_close"]) / res["pre_close"] * 100
+
+    res = res.drop(columns="period")
+    columns = [c for c in df.columns if c in res.columns]
+    return res[columns].sort_values(keys + ["trade_date"], ascending=[True] * len(keys) + [False]).reset_index(drop=True)
+
+
+def aggregate_daily(df: pd.DataFrame, aggregate: str) -> pd.DataFrame:
+    """
+    按股票对整个区间的数值字段做统计，并给出区间的起止交易日
+    """
+    _check_aggregate(aggregate)
+    if df.empty:
+        return df
+
+    df = df.sort_values("trade_date", kind="stable")
+    keys = _group_keys(df)
+    numeric = [c for c in df.select_dtypes("number").columns]
+
+    if keys:
+        grouped = df.groupby(keys, sort=True)
+        res = grouped[numeric].agg(aggregate)
+        res["start_date"] = grouped["trade_date"].first()
+        res["end_date"] = grouped["trade_date"].last()
+        res = res.reset_index()
+    else:
+        res = df[numeric].iloc[-1:] if aggregate == "last" else df[numeric].agg(aggregate).to_frame().T
+        res = res.reset_index(drop=True)
+        res["start_date"] = df["trade_date"].iloc[0]
+        res["end_date"] = df["trade_date"].iloc[-1]
+
+    return res[keys + ["start_date", "end_date"] + numeric]
+
+
+def top_n_rows(df: pd.DataFrame, n: int, sort_by: str) -> pd.DataFrame:
+    """按 sort_by 从大到小取前 n 条记录"""
+    if df.empty:
+        return df
+    sort_by = sort_by or "pct_chg"
+    if sort_by not in df.columns:
+        raise ValueError(f"排序字段不存在: {sort_by}")
+    return df.nlargest(int(n), sort_by).reset_index(drop=True)
+
+
+def plan_daily_chunks(ts_codes: list, trade_dates, row_limit: int = DAILY_ROW_LIMIT) -> list:
+    """
+    按单次行数上限将股票列表与交易日切分为若干块，返回 [(股票列表, 开始日期, 结束日期), ...]
+    """
+    days = len(trade_dates)
+    if not ts_codes or not days:
+        return []
+
+    if days >= row_limit:
+        group_size, window = 1, row_limit
+    else:
+        group_size, window = max(min(row_limit // days, DAILY_MAX_CODES), 1), days
+
+    date_batches = split_trade_dates(trade_dates, window)
+    return [
+        (ts_codes[i:i + group_size], batch_start, batch_end)
+        for i in range(0, len(ts_codes), group_size)
+        for batch_start, batch_end in date_batches
+    ]
+
+
+async def fetch_daily_chunk(codes: list, start_date: str, end_date: str, fields: list, retried: list) -> pd.DataFrame:
+    """
+    获取一个分块的日线，失败时退避重试；返回行数达到上限（可能被截断）时拆分后重新获取
+    """
+    for attempt in range(BULK_RETRIES + 1):
+        try:
+            df = await query("daily", priority=PRIORITY_BULK, ts_code=",".join(codes), start_date=start_date, end_date=end_date, fields=fields)
+            break
+        except Exception:
+            if attempt == BULK_RETRIES:
+                raise
+            retried.append({"ts_code": codes, "start_date": start_date, "end_date": end_date, "attempt": attempt + 1})
+            await asyncio.sleep(2 ** attempt)
+
+    if len(df) >= DAILY_ROW_LIMIT and len(codes) > 1:
+        logger.debug(f"日线分块行数达到上限，拆分后重新获取: {start_date}-{end_date}, {len(codes)}支股票")
+        middle = len(codes) // 2
+        parts = await asyncio.gather(
+            fetch_daily_chunk(codes[:middle], start_date, end_date, fields, retried),
+            fetch_daily_chunk(codes[middle:], start_date, end_date, fields, retried),
+        )
+        df = pd.concat(parts, ignore_index=True)
+    return df
+
+
+async def fetch_daily_range(ts_codes: list, trade_dates, fields: list):
+    """
+    按分块并发获取多支股票的日线（按接口配额限流，以批量优先级排队），最后一次性拼接；
+    返回 (DataFrame, 重试过的分块)
+    """
+    chunks = plan_daily_chunks(ts_codes, trade_dates)
+    retried = []
+    frames = await asyncio.gather(*[
+        fetch_daily_chunk(codes, chunk_start, chunk_end, fields, retried)
+        for codes, chunk_start, chunk_end in chunks
+    ])
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=fields or None)
+    return df, retried
+
+
+@register_fields()
+async def daily_bulk(
+    ts_code: str,
+    start_date: str,
+    end_date: str,
+    fields: Optional[list] = None,
+) -> dict:
+
+    """
+    Name:
+        A股日线行情（批量）。
+
+    Description:
+        批量获取多支股票在指定时间范围内未复权的日线行情数据，适用于指数成分股、全市场等大批量查询。
+
+    Args:
+        | 名称       | 类型  | 必填 | 描述                                   |
+        |------------|-------|------|----------------------------------------|
+        | ts_code    | str   | 是    | 股票代码，多个股票用逗号分隔，数量不限，也可以输入股票名称或拼音缩写 |
+        | start_date | str   | 是    | 开始日期（YYYYMMDD） |
+        | end_date   | str   | 是    | 结束日期（YYYYMMDD） |
+        | fields     | list  | 否    | 从Fields中选取需要查询的字段  |
+
+    Fields:
+        - ts_code: 股票代码
+        - trade_date: 交易日期
+        - open: 开盘价
+        - high: 最高价
+        - low: 最低价
+        - close: 收盘价
+        - pre_close: 昨收价【除权价，前复权】
+        - change: 涨跌额
+        - pct_chg: 涨跌幅 【基于除权后的昨收计算的涨跌幅：（今收-除权昨收）/除权昨收】
+        - vol: 成交量 （手）
+        - amount: 成交额 （千元）
+
+    """
+    try:
+        # 日期标准化
+        start_date = standardize_date(start_date)
+
+        end_date = standardize_date(end_date)
+
+        # 股票代码标准化（支持名称、拼音缩写）
+        ts_code = await normalize_ts_code(ts_code)
+        ts_codes = list(dict.fromkeys(code.strip().upper() for code in ts_code.split(",") if code.strip()))
+
+        # 校验字段并添加股票代码和交易日
+        fields = field_catalog.projection("daily", fields, required=['ts_code', 'trade_date'])
+
+        trade_dates = await get_trade_date_array(start_date=start_date, end_date=end_date)
+        if not len(trade_dates) or not ts_codes:
+            return pd.DataFrame(columns=fields or None)
+
+        # 截面已缓存较多或股票数量接近全市场时，从全市场截面切片更便宜
+        chunk_count = len(plan_daily_chunks(ts_codes, trade_dates))
+        if use_snapshots(len(ts_codes), trade_dates, calls=chunk_count, rows=len(ts_codes) * len(trade_dates)):
+            df = select_fields(await daily_snapshots.slice(ts_codes, to_date_str(trade_dates)), fields)
+            df.attrs["chunks"] = 0
+            df.attrs["retried_chunks"] = []
+            return df
+
+        df, retried = await fetch_daily_range(ts_codes, trade_dates, fields)
+
+        if retried:
+            logger.info(f"批量日线重试的分块: {retried}")
+        df.attrs["chunks"] = chunk_count
+        df.attrs["retried_chunks"] = retried
+        return df
+
+    except Exception as e:
+        logger.error(f"批量获取股票日线行情数据失败！\n ", exc_info=True)
+        raise Exception(f"批量获取股票日线行情数据失败！\n {str(e)}") from e
@@ -0,0 +1,225 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.findata_log import setup_logger
+from .cachePolicy import ttl_for
+
+logger = setup_logger()
+
+# 计算所需的报表字段
+RATIO_INPUTS = {
+    "income": ["revenue", "oper_cost", "operate_profit", "n_income", "n_income_attr_p"],
+    "balancesheet": ["total_assets", "total_liab", "total_hldr_eqy_exc_min_int",
+                     "total_cur_assets", "total_cur_liab", "total_share"],
+    "cashflow": ["n_cashflow_act", "c_pay_acq_const_fiolta"],
+}
+
+# 支持的比率，说明见 financial_ratios 工具
+RATIOS = [
+    "roe",
+    "roa",
+    "gross_margin",
+    "operating_margin",
+    "net_margin",
+    "debt_to_assets",
+    "debt_to_equity",
+    "current_ratio",
+    "fcf",
+    "fcf_ttm",
+    "revenue_ttm",
+    "n_income_attr_p_ttm",
+    "revenue_yoy",
+    "n_income_attr_p_yoy",
+    "revenue_qoq",
+    "n_income_attr_p_qoq",
+    "eps_ttm",
+    "bvps",
+    "fcf_per_share",
+]
+
+
+def quarter_index(end_dates) -> np.ndarray:
+    """报告期（YYYYMMDD）转换为季度序号：年份*4+季度-1"""
+    values = pd.Series(end_dates, dtype="object").astype(str)
+    return values.str[:4].astype(int).to_numpy() * 4 + (values.str[4:6].astype(int).to_numpy() - 1) // 3
+
+
+def quarter_end(index: np.ndarray) -> list:
+    """季度序号转换为报告期（YYYYMMDD）"""
+    ends = {0: "0331", 1: "0630", 2: "0930", 3: "1231"}
+    return [f"{q // 4}{ends[q % 4]}" for q in np.asarray(index)]
+
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """沿季度方向平移，空出的位置为 NaN"""
+    result = np.full_like(values, np.nan)
+    if periods < values.shape[1]:
+        result[:, periods:] = values[:, :values.shape[1] - periods]
+    return result
+
+
+def divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / denominator
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    return divide(current - previous, np.abs(previous))
+
+
+def average(values: np.ndarray, periods: int = 4) -> np.ndarray:
+    """期初期末平均，缺少期初值时使用期末值"""
+    previous = shift(values, periods)
+    return np.where(np.isnan(previous), values, (values + previous) / 2)
+
+
+def single_quarter(ytd: np.ndarray, first_quarter: int) -> np.ndarray:
+    """由累计值计算单季值，first_quarter 为第一列的季度序号"""
+    q1 = ((first_quarter + np.arange(ytd.shape[1])) % 4) == 0
+    return np.where(q1, ytd, ytd - shift(ytd, 1))
+
+
+def ttm(ytd: np.ndarray, first_quarter: int) -> np.ndarray:
+    """由累计值计算滚动十二个月：本期累计 + 上年年报 - 上年同期累计"""
+    columns = np.arange(ytd.shape[1])
+    last_annual = columns - ((first_quarter + columns) % 4) - 1
+    annual = np.full_like(ytd, np.nan)
+    valid = last_annual >= 0
+    annual[:, valid] = ytd[:, last_annual[valid]]
+    result = ytd + annual - shift(ytd, 4)
+    # 年报本身即为十二个月
+    q4 = ((first_quarter + columns) % 4) == 3
+    result[:, q4] = ytd[:, q4]
+    return result
+
+
+def build_panel(frames: dict):
+    """
+    将各报表整理为 (股票, 季度) 的二维数组，缺失的报告期为 NaN；
+    返回 (股票代码, 第一个季度序号, {字段: 二维数组})
+    """
+    frames = {api: df for api, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return [], 0, {}
+
+    codes = sorted(set().union(*[set(df["ts_code"]) for df in frames.values()]))
+    code_index = {code: i for i, code in enumerate(codes)}
+    quarters = {api: quarter_index(df["end_date"]) for api, df in frames.items()}
+    first = min(q.min() for q in quarters.values())
+    width = max(q.max() for q in quarters.values()) - first + 1
+
+    panel = {}
+    for api, df in frames.items():
+        rows = df["ts_code"].map(code_index).to_numpy()
+        cols = quarters[api] - first
+        for field in RATIO_INPUTS[api]:
+            values = np.full((len(codes), width), np.nan)
+            if field in df:
+                values[rows, cols] = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=float)
+            panel[field] = values
+    for fields in RATIO_INPUTS.values():
+        for field in fields:
+            panel.setdefault(field, np.full((len(codes), width), np.nan))
+    return codes, first, panel
+
+
+def compute_ratios(frames: dict) -> pd.DataFrame:
+    """
+    在 (股票, 季度) 二维数组上一次性计算全部比率，返回长表 (ts_code, end_date, 比率...)；
+    frames 为 {报表名: 每个报告期只有一个版本的报表}
+    """
+    codes, first, p = build_panel(frames)
+    if not codes:
+        return pd.DataFrame(columns=["ts_code", "end_date"] + list(RATIOS))
+
+    revenue_ttm = ttm(p["revenue"], first)
+    profit_ttm = ttm(p["n_income_attr_p"], first)
+    fcf = p["n_cashflow_act"] - p["c_pay_acq_const_fiolta"]
+    fcf_ttm = ttm(fcf, first)
+    equity = p["total_hldr_eqy_exc_min_int"]
+    revenue_q = single_quarter(p["revenue"], first)
+    profit_q = single_quarter(p["n_income_attr_p"], first)
+
+    ratios = {
+        "roe": divide(profit_ttm, average(equity)),
+        "roa": divide(ttm(p["n_income"], first), average(p["total_assets"])),
+        "gross_margin": divide(p["revenue"] - p["oper_cost"], p["revenue"]),
+        "operating_margin": divide(p["operate_profit"], p["revenue"]),
+        "net_margin": divide(p["n_income_attr_p"], p["revenue"]),
+        "debt_to_assets": divide(p["total_liab"], p["total_assets"]),
+        "debt_to_equity": divide(p["total_liab"], equity),
+        "current_ratio": divide(p["total_cur_assets"], p["total_cur_liab"]),
+        "fcf": fcf,
+        "fcf_ttm": fcf_ttm,
+        "revenue_ttm": revenue_ttm,
+        "n_income_attr_p_ttm": profit_ttm,
+        "revenue_yoy": growth(p["revenue"], shift(p["revenue"], 4)),
+        "n_income_attr_p_yoy": growth(p["n_income_attr_p"], shift(p["n_income_attr_p"], 4)),
+        "revenue_qoq": growth(revenue_q, shift(revenue_q, 1)),
+        "n_income_attr_p_qoq": growth(profit_q, shift(profit_q, 1)),
+        "eps_ttm": divide(profit_ttm, p["total_share"]),
+        "bvps": divide(equity, p["total_share"]),
+        "fcf_per_share": divide(fcf_ttm, p["total_share"]),
+    }
+
+    width = p["revenue"].shape[1]
+    df = pd.DataFrame({
+        "ts_code": np.repeat(codes, width),
+        "end_date": quarter_end(np.tile(np.arange(first, first + width), len(codes))),
+        **{name: values.ravel() for name, values in ratios.items()},
+    })
+    # 只保留有报表数据的报告期
+    reported = np.zeros((len(codes), width), dtype=bool)
+    for fields in RATIO_INPUTS.values():
+        reported |= ~np.isnan(p[fields[0]])
+    return df[reported.ravel()].reset_index(drop=True)
+
+
+class RatioStore:
+    """
+    按报告期保存的财务比率
+
+    每个报告期一个本地列式文件，记录各股票的比率及计算时间；
+    有效期与 cachePolicy 中财务报表的规则相同：已过去的报告期长期有效，其余每天重新计算。
+    """
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+
+    def _path(self, period: str) -> str:
+        return os.path.join(self.store_dir, period + FRAME_SUFFIX)
+
+    def load(self, period: str) -> pd.DataFrame:
+        path = self._path(period)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return read_frame(path)
+        except Exception:
+            logger.warning(f"读取{period}财务比率失败，将重新计算", exc_info=True)
+            return pd.DataFrame()
+
+    def get(self, period: str, ts_codes: list) -> pd.DataFrame:
+        """返回仍然有效的已计算比率"""
+        df = self.load(period)
+        if df.empty:
+            return df
+        ttl = ttl_for("income", {"period": period})
+        valid = df["ts_code"].isin(set(ts_codes))
+        if ttl is not None:
+            valid &= df["computed_at"] + ttl > time.time()
+        return df[valid].reset_index(drop=True)
+
+    def put(self, df: pd.DataFrame):
+        """按报告期写入新计算的比率，同一股票以新结果为准"""
+        df = df.assign(computed_at=time.time())
+        for period, part in df.groupby("end_date", sort=False):
+            merged = pd.concat([self.load(period), part], ignore_index=True)
+            merged = merged.drop_duplicates(subset=["ts_code"], keep="last")
+            write_frame(merged.reset_index(drop=True), self._path(period))
+
+
+ratio_store = RatioStore(get_cache_dir("ratios"))
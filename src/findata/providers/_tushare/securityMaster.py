@@ -0,0 +1,255 @@
+import os
+import re
+import time
+import asyncio
+import pandas as pd
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 两次同步股票列表之间的最小间隔（秒）
+MASTER_REFRESH_INTERVAL = int(os.getenv("FINDATA_SECURITY_MASTER_REFRESH", "86400"))
+
+MASTER_FIELDS = [
+    "ts_code", "symbol", "name", "area", "industry", "fullname", "enname", "cnspell", "market",
+    "exchange", "curr_type", "list_status", "list_date", "delist_date", "is_hs", "act_name", "act_ent_type",
+]
+
+# 支持 600519.SH、600519SH、SH600519、sh.600519、600519 等写法
+CODE_PATTERN = re.compile(r"(?:(SH|SZ|BJ)\.?)?(\d{6})(?:\.?(SH|SZ|BJ))?", re.IGNORECASE)
+
+# 模糊查找时最多返回的候选数量
+MAX_CANDIDATES = 10
+
+
+def infer_exchange(symbol: str) -> str:
+    """根据6位代码的号段推断交易所后缀"""
+    if symbol.startswith(("4", "8", "92")):
+        return "BJ"
+    if symbol.startswith(("6", "9")):
+        return "SH"
+    return "SZ"
+
+
+class PrefixTrie:
+    """
+    前缀树，用于按名称、拼音缩写的前缀模糊查找
+    """
+    _END = ""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key: str, value: int):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(self._END, []).append(value)
+
+    def search(self, prefix: str, limit: int = MAX_CANDIDATES) -> list:
+        """返回以 prefix 开头的键对应的值，较短的键在前"""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        values, level = [], [node]
+        while level and len(values) < limit:
+            next_level = []
+            for current in level:
+                for char, child in current.items():
+                    if char == self._END:
+                        values.extend(child)
+                    else:
+                        next_level.append(child)
+            level = next_level
+        return list(dict.fromkeys(values))[:limit]
+
+
+class SecurityMaster:
+    """
+    证券主表
+
+    每天从 stock_basic 同步一次全部股票（上市、退市、暂停上市）并保存到本地，
+    在内存中按 ts_code、symbol、name、cnspell 建立哈希索引，名称与拼音缩写的前缀树在首次模糊查找时建立；
+    股票代码的标准化与 stock_basic 的查询都可以在本地完成。
+    """
+    def __init__(self, cache_dir: str):
+        self.path = os.path.join(cache_dir, "security_master" + FRAME_SUFFIX)
+        self.df = pd.DataFrame(columns=MASTER_FIELDS)
+        self.synced_at = 0.0
+        self._lock = None
+        self._trie = None
+        self._build(self.df)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            self._build(read_frame(self.path))
+            self.synced_at = os.path.getmtime(self.path)
+            logger.debug(f"加载证券主表: {len(self.df)}只股票")
+        except Exception:
+            logger.warning("读取证券主表失败，将重新下载", exc_info=True)
+
+    def _build(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.by_ts_code = {}
+        self.by_symbol = {}
+        self.by_name = {}
+        self.by_cnspell = {}
+        columns = [self.df[c].astype(str).tolist() if c in self.df else [""] * len(self.df)
+                   for c in ("ts_code", "symbol", "name", "cnspell")]
+        for idx, (ts_code, symbol, name, cnspell) in enumerate(zip(*columns)):
+            self.by_ts_code[ts_code.upper()] = idx
+            self.by_symbol.setdefault(symbol, []).append(idx)
+            self.by_name.setdefault(name, []).append(idx)
+            self.by_cnspell.setdefault(cnspell.lower(), []).append(idx)
+        self._trie = None
+
+    def trie(self) -> PrefixTrie:
+        if self._trie is None:
+            trie = PrefixTrie()
+            for name, idx in ((name, idx) for name, ids in self.by_name.items() for idx in ids):
+                trie.insert(name, idx)
+            for cnspell, ids in self.by_cnspell.items():
+                for idx in ids:
+                    trie.insert(cnspell, idx)
+            self._trie = trie
+        return self._trie
+
+    def is_loaded(self) -> bool:
+        return not self.df.empty
+
+    def is_fresh(self) -> bool:
+        return self.is_loaded() and time.time() - self.synced_at < MASTER_REFRESH_INTERVAL
+
+    async def refresh(self, force: bool = False):
+        """
+        同步全部股票列表（上市、退市、暂停上市），同步失败时继续使用本地数据
+        """
+        from .common import query
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not force and self.is_fresh():
+                return
+            try:
+                frames = await asyncio.gather(*[
+                    query("stock_basic", cache=False, list_status=status, fields=MASTER_FIELDS)
+                    for status in ("L", "D", "P")
+                ])
+            except Exception:
+                logger.warning("同步证券主表失败", exc_info=True)
+                # 避免同步失败时每次调用都重试
+                self.synced_at = time.time() - MASTER_REFRESH_INTERVAL + 300
+                return
+
+            frames = [frame for frame in frames if frame is not None and not frame.empty]
+            if not frames:
+                return
+            df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=["ts_code"], keep="first")
+            self._build(df)
+            self.synced_at = time.time()
+            write_frame(self.df, self.path)
+            logger.info(f"同步证券主表: {len(self.df)}只股票")
+
+    async def ensure(self):
+        """本地主表不存在或已过期时同步"""
+        if not self.is_fresh():
+            await self.refresh()
+
+    def _pick(self, ids: list) -> list:
+        # 同名或同拼音时优先选择上市状态的股票
+        if len(ids) > 1 and "list_status" in self.df:
+            listed = [idx for idx in ids if self.df.at[idx, "list_status"] == "L"]
+            if listed:
+                return listed
+        return ids
+
+    def lookup(self, text: str) -> list:
+        """按 ts_code、symbol、name、cnspell 精确查找，返回行号列表"""
+        text = text.strip()
+        idx = self.by_ts_code.get(text.upper())
+        if idx is not None:
+            return [idx]
+        for index, key in ((self.by_symbol, text), (self.by_name, text), (self.by_cnspell, text.lower())):
+            ids = index.get(key)
+            if ids:
+                return self._pick(ids)
+        return []
+
+    def search(self, text: str, limit: int = MAX_CANDIDATES) -> pd.DataFrame:
+        """按名称或拼音缩写前缀模糊查找"""
+        text = text.strip()
+        ids = self.lookup(text) or self.trie().search(text, limit) or self.trie().search(text.lower(), limit)
+        return self.df.iloc[ids[:limit]].reset_index(drop=True)
+
+    def _describe(self, ids: list) -> str:
+        return ", ".join(f"{self.df.at[idx, 'name']}({self.df.at[idx, 'ts_code']})" for idx in ids)
+
+    def resolve(self, text: str) -> str:
+        """
+        将股票代码、名称或拼音缩写标准化为 ts_code，无法唯一确定时抛出 ValueError
+        """
+        text = text.strip()
+        match = CODE_PATTERN.fullmatch(text)
+        if match:
+            prefix, symbol, suffix = match.groups()
+            if prefix and suffix and prefix.upper() != suffix.upper():
+                raise ValueError(f"无效的股票代码: {text}")
+            exchange = (prefix or suffix or "").upper()
+            if exchange:
+                return f"{symbol}.{exchange}"
+            ids = self.by_symbol.get(symbol)
+            if ids and len(ids) == 1:
+                return self.df.at[ids[0], "ts_code"]
+            return f"{symbol}.{infer_exchange(symbol)}"
+
+        ids = self.lookup(text)
+        if len(ids) == 1:
+            return self.df.at[ids[0], "ts_code"]
+        if len(ids) > 1:
+            raise ValueError(f"股票不唯一: {text}，可选: {self._describe(ids[:MAX_CANDIDATES])}")
+
+        candidates = self.trie().search(text) or self.trie().search(text.lower())
+        if candidates:
+            raise ValueError(f"未找到股票: {text}，是否为: {self._describe(candidates)}")
+        raise ValueError(f"未找到股票: {text}")
+
+    def filter(self, **params) -> pd.DataFrame:
+        """按 stock_basic 的参数在本地筛选，list_status 默认为 L"""
+        params = {name: value for name, value in params.items() if value}
+        params.setdefault("list_status", "L")
+        mask = pd.Series(True, index=self.df.index)
+        for name, value in params.items():
+            mask &= self.df[name].astype(str) == str(value).strip()
+        return self.df[mask].reset_index(drop=True)
+
+    def stats(self) -> dict:
+        return {
+            "securities": len(self.df),
+            "synced_at": self.synced_at,
+            "trie_built": self._trie is not None,
+        }
+
+
+security_master = SecurityMaster(get_cache_dir())
+
+
+async def normalize_ts_code(ts_code: str) -> str:
+    """
+    标准化股票代码（支持逗号分隔的多个股票），可以输入 ts_code、6位代码、股票名称或拼音缩写；
+    只有代码形式的输入时不需要同步证券主表
+    """
+    if not ts_code:
+        return ts_code
+    codes = [code.strip() for code in str(ts_code).split(",") if code.strip()]
+    if not all(CODE_PATTERN.fullmatch(code) for code in codes):
+        await security_master.ensure()
+    return ",".join(dict.fromkeys(security_master.resolve(code) for code in codes))
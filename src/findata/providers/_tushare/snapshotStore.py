@@ -0,0 +1,114 @@
+import os
+import asyncio
+import pandas as pd
+from datetime import datetime
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.findata_log import setup_logger
+from .tradeCalendar import to_date_str
+
+logger = setup_logger()
+
+# 成本模型参数：一次接口调用的固定开销折合的行数、全市场股票数量、本地读取一行相对接口传输一行的开销
+CALL_COST = float(os.getenv("FINDATA_COST_PER_CALL", "2000"))
+MARKET_ROWS = int(os.getenv("FINDATA_MARKET_ROWS", "5400"))
+LOCAL_ROW_COST = float(os.getenv("FINDATA_COST_LOCAL_ROW", "0.01"))
+
+# 当天日线数据更新完成的时间（HH:MM），之后当天的截面视为已收盘
+DAILY_READY_TIME = os.getenv("FINDATA_DAILY_READY_TIME", "17:00")
+
+
+def is_closed(trade_date: str, now: datetime = None) -> bool:
+    """交易日的日线是否已更新完整"""
+    now = now or datetime.now()
+    today = now.strftime("%Y%m%d")
+    return trade_date < today or (trade_date == today and now.strftime("%H:%M") >= DAILY_READY_TIME)
+
+
+class DailySnapshotStore:
+    """
+    全市场日线截面
+
+    daily(trade_date=X) 一次即可返回全市场当天的行情，已收盘交易日的截面保存到本地，
+    按股票、按区间的查询可以直接从截面中切片得到。
+    """
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._locks = {}
+
+    def _path(self, trade_date: str) -> str:
+        return os.path.join(self.store_dir, trade_date + FRAME_SUFFIX)
+
+    def _lock(self, trade_date: str) -> asyncio.Lock:
+        lock = self._locks.get(trade_date)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[trade_date] = lock
+        return lock
+
+    def is_cached(self, trade_date: str) -> bool:
+        return os.path.exists(self._path(trade_date))
+
+    def cached_count(self, trade_dates: list) -> int:
+        return sum(1 for trade_date in trade_dates if self.is_cached(trade_date))
+
+    async def get(self, trade_date: str) -> pd.DataFrame:
+        """
+        获取某个交易日的全市场日线（全部字段）
+        """
+        from .common import query
+
+        path = self._path(trade_date)
+        if os.path.exists(path):
+            return read_frame(path)
+
+        # 当天的截面尚未更新完整，交给结果缓存按短有效期处理
+        if not is_closed(trade_date):
+            return await query("daily", trade_date=trade_date)
+
+        async with self._lock(trade_date):
+            if os.path.exists(path):
+                return read_frame(path)
+            df = await query("daily", cache=False, trade_date=trade_date)
+            if df is not None and not df.empty:
+                write_frame(df, path)
+            return df
+
+    async def slice(self, ts_codes: list, trade_dates: list) -> pd.DataFrame:
+        """
+        从多个交易日的截面中切出指定股票的日线
+        """
+        frames = await asyncio.gather(*[self.get(trade_date) for trade_date in trade_dates])
+        codes = set(ts_codes)
+        frames = [frame[frame["ts_code"].isin(codes)] for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values("trade_date", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def snapshot_cost(days: int, cached_days: int) -> float:
+    """按截面获取的成本：未缓存的交易日各调用一次接口，并读取全部截面"""
+    return (days - cached_days) * (CALL_COST + MARKET_ROWS) + days * MARKET_ROWS * LOCAL_ROW_COST
+
+
+def per_symbol_cost(calls: int, rows: int) -> float:
+    """按股票获取的成本：接口调用次数与需要传输的行数"""
+    return calls * CALL_COST + rows
+
+
+def use_snapshots(n_symbols: int, trade_dates, calls: int, rows: int) -> bool:
+    """
+    成本模型：比较按截面切片与按股票请求的开销，截面更便宜时返回 True
+    """
+    trade_dates = to_date_str(trade_dates)
+    if not trade_dates or not n_symbols:
+        return False
+    cached_days = daily_snapshots.cached_count(trade_dates)
+    by_snapshot = snapshot_cost(len(trade_dates), cached_days)
+    by_symbol = per_symbol_cost(calls, rows)
+    logger.debug(f"日线获取成本: 截面={by_snapshot:.0f}, 按股票={by_symbol:.0f}, "
+                 f"股票数={n_symbols}, 交易日={len(trade_dates)}, 已缓存截面={cached_days}")
+    return by_snapshot < by_symbol
+
+
+daily_snapshots = DailySnapshotStore(get_cache_dir("daily_snapshot"))
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import asyncio
+import pandas as pd
+from datetime import datetime, timedelta
+from utils.cache import FRAME_SUFFIX, get_cache_dir, read_frame, write_frame
+from utils.field_catalog import field_catalog
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 两次增量同步之间的最小间隔（秒）
+STATEMENT_REFRESH_INTERVAL = int(os.getenv("FINDATA_STATEMENT_REFRESH", "86400"))
+
+# 增量同步时向前回溯的天数，用于获取对以往报告期的更正（update_flag）
+STATEMENT_LOOKBACK_DAYS = int(os.getenv("FINDATA_STATEMENT_LOOKBACK_DAYS", "400"))
+
+# 同一报告期的不同版本按 (实际公告日期, 更新标识) 区分
+VERSION_KEYS = ["end_date", "report_type", "f_ann_date", "update_flag"]
+
+
+def announced_date(df: pd.DataFrame) -> pd.Series:
+    """实际公告日期，缺失时使用公告日期"""
+    if "f_ann_date" not in df:
+        return df["ann_date"].astype(str)
+    return df["f_ann_date"].fillna(df["ann_date"]).astype(str)
+
+
+def as_of_filter(df: pd.DataFrame, as_of: str) -> pd.DataFrame:
+    """
+    时点数据：只保留 as_of 当天及之前已公告的版本，每个 (报告期, 报告类型) 取最新的一个版本
+    """
+    if df is None or df.empty:
+        return df
+    known = df[announced_date(df) <= as_of]
+    if known.empty:
+        return known.reset_index(drop=True)
+
+    keys = [c for c in ("end_date", "report_type") if c in known]
+    order = keys + ["_announced"] + (["update_flag"] if "update_flag" in known else [])
+    known = known.assign(_announced=announced_date(known)).sort_values(order, kind="stable")
+    known = known.drop_duplicates(subset=keys, keep="last").drop(columns="_announced")
+    return known.sort_values("end_date", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def filter_statements(df: pd.DataFrame, ann_date: str = "", f_ann_date: str = "", start_date: str = "",
+                      end_date: str = "", period: str = "", comp_type: str = "") -> pd.DataFrame:
+    """按接口参数在本地筛选：start_date/end_date 为公告日期范围，period 为报告期"""
+    mask = pd.Series(True, index=df.index)
+    if ann_date:
+        mask &= df["ann_date"].astype(str) == ann_date
+    if f_ann_date:
+        mask &= df["f_ann_date"].astype(str) == f_ann_date
+    if start_date:
+        mask &= df["ann_date"].astype(str) >= start_date
+    if end_date:
+        mask &= df["ann_date"].astype(str) <= end_date
+    if period:
+        mask &= df["end_date"].astype(str) == str(period)
+    if comp_type and "comp_type" in df:
+        mask &= df["comp_type"].astype(str) == str(comp_type)
+    return df[mask].reset_index(drop=True)
+
+
+class StatementStore:
+    """
+    按股票保存的财务报表（利润表、资产负债表、现金流量表）
+
+    每只股票每张报表保存为一个本地列式文件（包括工具说明中列出的全部字段），保留每个报告期所有已公告的版本，
+    按 (报告期, 实际公告日期) 排序；首次查询时下载全部历史，之后每天按公告日期增量同步一次，
+    并回溯一段时间以获取更正后的版本（update_flag）。
+    时点查询（截至某日已公告的数据）直接在本地完成。
+    """
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._locks = {}
+
+    def _paths(self, api_name: str, ts_code: str):
+        base = os.path.join(self.store_dir, api_name, ts_code.upper())
+        return base + FRAME_SUFFIX, base + ".json"
+
+    def _lock(self, api_name: str, ts_code: str) -> asyncio.Lock:
+        key = (api_name, ts_code)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    def load(self, api_name: str, ts_code: str):
+        """读取本地报表及同步信息"""
+        frame_path, meta_path = self._paths(api_name, ts_code)
+        if not (os.path.exists(frame_path) and os.path.exists(meta_path)):
+            return None, {}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return read_frame(frame_path), meta
+        except Exception:
+            logger.warning(f"读取{ts_code}本地{api_name}失败，将重新下载", exc_info=True)
+            return None, {}
+
+    def save(self, api_name: str, ts_code: str, df: pd.DataFrame, meta: dict):
+        frame_path, meta_path = self._paths(api_name, ts_code)
+        write_frame(df, frame_path)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    @staticmethod
+    def merge(df: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """合并新下载的数据，相同版本以新数据为准"""
+        frames = [frame for frame in (df, new) if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        merged = pd.concat(frames, ignore_index=True)
+        keys = [c for c in VERSION_KEYS if c in merged]
+        merged = merged.drop_duplicates(subset=keys, keep="last")
+        order = [c for c in ("end_date", "f_ann_date") if c in merged]
+        return merged.sort_values(order, ascending=False, kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def fields(api_name: str) -> list:
+        """
+        本地保存的字段：工具说明中列出的全部字段（接口默认只返回其中一部分），以及区分版本所需的字段
+        """
+        fields = field_catalog.fields(api_name)
+        return fields + [key for key in ["ts_code", "ann_date"] + VERSION_KEYS if key not in fields]
+
+    def is_fresh(self, api_name: str, df, meta: dict) -> bool:
+        return (df is not None and meta.get("fields") == self.fields(api_name)
+                and time.time() - meta.get("synced_at", 0) < STATEMENT_REFRESH_INTERVAL)
+
+    def cached(self, api_name: str, ts_code: str):
+        """本地数据未过期时返回全部版本，否则返回 None"""
+        df, meta = self.load(api_name, ts_code.upper())
+        return df if self.is_fresh(api_name, df, meta) else None
+
+    async def get(self, api_name: str, ts_code: str) -> pd.DataFrame:
+        """
+        获取某只股票某张报表的全部版本，本地数据过期时增量同步
+        """
+        from .common import query
+
+        ts_code = ts_code.upper()
+        async with self._lock(api_name, ts_code):
+            df, meta = self.load(api_name, ts_code)
+            if self.is_fresh(api_name, df, meta):
+                return df
+
+            # 保存的字段有变化（如旧版本只保存了接口默认字段）时重新下载全部历史
+            fields = self.fields(api_name)
+            if df is not None and meta.get("fields") != fields:
+                df, meta = None, {}
+
+            params = {}
+            if df is not None and meta.get("synced_date"):
+                synced = datetime.strptime(meta["synced_date"], "%Y%m%d")
+                params["start_date"] = (synced - timedelta(days=STATEMENT_LOOKBACK_DAYS)).strftime("%Y%m%d")
+
+            new = await query(api_name, cache=False, ts_code=ts_code, fields=fields, **params)
+            logger.debug(f"同步{ts_code} {api_name}: {params or '全部历史'}，{0 if new is None else len(new)}条")
+            df = self.merge(df, new)
+            self.save(api_name, ts_code, df, {
+                "synced_at": time.time(),
+                "synced_date": datetime.now().strftime("%Y%m%d"),
+                "fields": fields,
+            })
+            return df
+
+    async def query(self, api_name: str, ts_code: str, as_of: str = "", **filters) -> pd.DataFrame:
+        """
+        在本地查询报表，as_of 不为空时只返回截至该日已公告的最新版本
+        """
+        df = await self.get(api_name, ts_code)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        df = filter_statements(df, **filters)
+        return as_of_filter(df, as_of) if as_of else df
+
+
+statement_store = StatementStore(get_cache_dir("statements"))
@@ -0,0 +1,188 @@
+import os
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+from utils.date_processor import standardize_date, standardize_dates
+from utils.cache import get_cache_dir
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 交易日历最早日期
+CALENDAR_START = np.datetime64("1990-01-01", "D")
+
+# 两次增量刷新之间的最小间隔（秒）
+REFRESH_INTERVAL = int(os.getenv("FINDATA_CALENDAR_REFRESH_INTERVAL", "3600"))
+
+
+def to_datetime64(date) -> np.datetime64:
+    """将 YYYYMMDD 等格式的日期转换为 datetime64[D]"""
+    if isinstance(date, np.datetime64):
+        return date.astype("datetime64[D]")
+    date = standardize_date(str(date))
+    return np.datetime64(f"{date[:4]}-{date[4:6]}-{date[6:]}", "D")
+
+
+def to_datetime64_array(dates) -> np.ndarray:
+    """将日期序列（YYYYMMDD 或其他可识别的格式）转换为 datetime64[D] 数组"""
+    return pd.to_datetime(standardize_dates(dates), format="%Y%m%d").values.astype("datetime64[D]")
+
+
+def to_date_str(dates) -> list:
+    """将 datetime64[D] 数组转换为 YYYYMMDD 字符串列表"""
+    return [d.replace("-", "") for d in np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]"), unit="D")]
+
+
+def sorted_contains(sorted_dates: np.ndarray, dates) -> np.ndarray:
+    """在升序日期数组中二分查找，批量判断 dates 是否存在，返回布尔数组"""
+    values = np.asarray(dates, dtype="datetime64[D]")
+    if not len(sorted_dates):
+        return np.zeros(len(values), dtype=bool)
+    idx = np.searchsorted(sorted_dates, values)
+    idx[idx >= len(sorted_dates)] = 0
+    return sorted_dates[idx] == values
+
+
+class TradeCalendar:
+    """
+    单个交易所的交易日历
+
+    交易日以升序的 datetime64[D] 数组保存在内存中，并持久化到本地；
+    区间、前后交易日等查询均通过二分查找完成，不访问网络。
+    """
+    def __init__(self, exchange: str, cache_dir: str):
+        self.exchange = exchange
+        self.path = os.path.join(cache_dir, f"trade_cal_{exchange}.npz")
+        self.dates = np.array([], dtype="datetime64[D]")
+        # 已同步的自然日范围（包含休市日）
+        self.coverage_start = None
+        self.coverage_end = None
+        self.synced_at = 0.0
+        self._lock = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.dates = data["dates"].astype("datetime64[D]")
+                self.coverage_start, self.coverage_end = data["coverage"].astype("datetime64[D]")
+                self.synced_at = float(data["synced_at"])
+            logger.debug(f"加载{self.exchange}交易日历: {len(self.dates)}个交易日")
+        except Exception:
+            logger.warning(f"读取{self.exchange}交易日历缓存失败，将重新下载", exc_info=True)
+            self.dates = np.array([], dtype="datetime64[D]")
+            self.coverage_start = self.coverage_end = None
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            dates=self.dates,
+            coverage=np.array([self.coverage_start, self.coverage_end], dtype="datetime64[D]"),
+            synced_at=np.array(self.synced_at),
+        )
+        os.replace(tmp_path, self.path)
+
+    def covers(self, start: np.datetime64, end: np.datetime64) -> bool:
+        """本地日历是否已覆盖指定的自然日范围"""
+        return (
+            self.coverage_start is not None
+            and self.coverage_start <= start
+            and end <= self.coverage_end
+        )
+
+    async def refresh(self, force: bool = False):
+        """
+        增量同步交易日历：只下载本地尚未覆盖的日期
+        """
+        from .common import query
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not force and time.time() - self.synced_at < REFRESH_INTERVAL:
+                return
+
+            start = CALENDAR_START if self.coverage_end is None else self.coverage_end + 1
+            # 交易所一般在年底发布次年的日历
+            end = np.datetime64(f"{pd.Timestamp.today().year + 1}-12-31", "D")
+
+            df = await query(
+                "trade_cal",
+                cache=False,
+                exchange=self.exchange,
+                start_date=to_date_str([start])[0],
+                end_date=to_date_str([end])[0],
+                fields="cal_date,is_open",
+            )
+            self.synced_at = time.time()
+
+            if df is not None and not df.empty:
+                cal_dates = to_datetime64_array(df["cal_date"])
+                is_open = df["is_open"].astype(int).values == 1
+                new_dates = np.unique(np.concatenate([self.dates, cal_dates[is_open]]))
+                self.dates = new_dates
+                if self.coverage_start is None:
+                    self.coverage_start = cal_dates.min()
+                if self.coverage_end is None or cal_dates.max() > self.coverage_end:
+                    self.coverage_end = cal_dates.max()
+                logger.info(f"同步{self.exchange}交易日历至{to_date_str([self.coverage_end])[0]}")
+
+            self._save()
+
+    async def ensure(self, start, end):
+        """确保本地日历覆盖指定日期范围，未覆盖时增量刷新"""
+        if not self.covers(to_datetime64(start), to_datetime64(end)):
+            await self.refresh()
+
+    def range(self, start, end) -> np.ndarray:
+        """[start, end] 范围内的交易日"""
+        left = np.searchsorted(self.dates, to_datetime64(start), side="left")
+        right = np.searchsorted(self.dates, to_datetime64(end), side="right")
+        return self.dates[left:right]
+
+    def is_trading_day(self, date) -> bool:
+        date = to_datetime64(date)
+        idx = np.searchsorted(self.dates, date)
+        return bool(idx < len(self.dates) and self.dates[idx] == date)
+
+    def contains(self, dates) -> np.ndarray:
+        """批量判断是否为交易日，返回布尔数组"""
+        return sorted_contains(self.dates, dates)
+
+    def next_trading_day(self, date, include: bool = False):
+        """下一个交易日，include 为 True 时当天是交易日则返回当天"""
+        idx = np.searchsorted(self.dates, to_datetime64(date), side="left" if include else "right")
+        return self.dates[idx] if idx < len(self.dates) else None
+
+    def previous_trading_day(self, date, include: bool = False):
+        """上一个交易日，include 为 True 时当天是交易日则返回当天"""
+        idx = np.searchsorted(self.dates, to_datetime64(date), side="right" if include else "left") - 1
+        return self.dates[idx] if idx >= 0 else None
+
+    def shift(self, date, n: int):
+        """
+        从 date（含当天）往前数第 n 个交易日，n 为 0 时返回 date 当天或之前最近的交易日
+        """
+        idx = np.searchsorted(self.dates, to_datetime64(date), side="right") - 1 - n
+        return self.dates[idx] if 0 <= idx < len(self.dates) else None
+
+
+_calendars = {}
+
+
+def get_calendar(exchange: str = "") -> TradeCalendar:
+    """
+    获取交易所的交易日历，默认为上交所
+    """
+    exchange = (exchange or "SSE").upper()
+    calendar = _calendars.get(exchange)
+    if calendar is None:
+        calendar = TradeCalendar(exchange, get_cache_dir())
+        _calendars[exchange] = calendar
+    return calendar
@@ -1,16 +1,116 @@
 import os
+import json
+import time
 import importlib
 import argparse
 import inspect
+from contextlib import asynccontextmanager
 from types import ModuleType
 from mcp.server.fastmcp import FastMCP
+from mcp.types import Tool as MCPTool
+from utils.field_catalog import COMPACT_TOOLS
 from utils.findata_log import setup_logger
+from utils.manifest import load_manifest, manifest_path, save_manifest, source_hash
+from utils.scheduler import scheduler
 
 logger = setup_logger()
 
+# stdio 方式下是否延迟加载数据供应商：启动时只返回缓存的工具清单，首次调用工具时才导入
+LAZY_START = os.getenv("FINDATA_LAZY_START", "1") == "1"
+
 def decorate_async_functions(module: ModuleType, tool_decorator):
+    # tool_wrapper 依赖 pandas，在加载数据供应商时才导入
+    from utils.tool_wrapper import wrap_tool
+
     for name, func in inspect.getmembers(module, inspect.iscoroutinefunction):
-        setattr(module, name, tool_decorator(func))
+        # 工具返回的 DataFrame 统一分页并序列化为指定的输出格式
+        setattr(module, name, tool_decorator(wrap_tool(func)))
+
+
+class FinDataMCP(FastMCP):
+    """
+    finData MCP 服务
+
+    lazy 为 True 时启动只创建服务本身：list_tools 返回按源码哈希缓存在本地的工具清单，
+    首次调用工具（或清单缓存未命中）时才导入数据供应商（tushare、pandas 等）、生成工具并启动后台任务。
+    """
+    def __init__(self, name: str, provider: str, lazy: bool = False, single_session: bool = False, **settings):
+        super().__init__(name, lifespan=self._provider_lifespan, **settings)
+        self.provider = provider
+        self.single_session = single_session
+        self.module = None
+        root = os.path.dirname(os.path.abspath(__file__))
+        self.manifest_path = manifest_path(provider, source_hash(root, provider, f"compact={COMPACT_TOOLS}"))
+        self.register_stats_resource()
+        if not lazy:
+            self.load_provider()
+
+    def load_provider(self) -> ModuleType:
+        """导入数据供应商并注册工具与后台任务，只执行一次"""
+        if self.module is not None:
+            return self.module
+
+        start = time.monotonic()
+        module = importlib.import_module("providers._" + self.provider)
+        # 添加MCP装饰器
+        decorate_async_functions(module, self.tool())
+        # 分页结果的后续页，与数据供应商无关
+        from utils.tool_wrapper import fetch_next_page
+        self.tool(name="next_page")(fetch_next_page)
+        # 数据供应商提供后台任务时，在服务的事件循环中调度
+        if hasattr(module, "register_jobs"):
+            module.register_jobs(scheduler)
+        self.module = module
+        # 服务已在运行（延迟加载）时立即启动新注册的任务
+        scheduler.launch()
+        logger.info(f"加载数据供应商{self.provider}: {time.monotonic() - start:.2f}s")
+        return module
+
+    def register_stats_resource(self):
+        """
+        数据供应商提供运行统计时，注册为 MCP 资源 findata://stats
+        """
+        def stats() -> str:
+            """finData 运行统计：会话池、执行器、缓存命中率等"""
+            module = self.load_provider()
+            if not hasattr(module, "get_stats"):
+                return "{}"
+            return json.dumps(module.get_stats(), ensure_ascii=False, default=str)
+
+        self.resource("findata://stats", name="stats", mime_type="application/json")(stats)
+
+    @asynccontextmanager
+    async def _provider_lifespan(self, server: FastMCP):
+        """
+        在服务的事件循环中启动后台任务（每个进程一次）；
+        SSE 方式下每个连接都会进入 lifespan，后台任务在连接断开后继续运行，
+        只有 stdio 方式（会话结束即进程退出）在退出时停止
+        """
+        scheduler.start()
+        try:
+            yield {}
+        finally:
+            if self.single_session:
+                await scheduler.stop()
+
+    async def list_tools(self) -> list[MCPTool]:
+        if self.module is None:
+            tools = load_manifest(self.manifest_path)
+            if tools is not None:
+                return [MCPTool.model_validate(tool) for tool in tools]
+            self.load_provider()
+
+        tools = await super().list_tools()
+        if not os.path.exists(self.manifest_path):
+            try:
+                save_manifest(self.manifest_path, [tool.model_dump(mode="json", exclude_none=True) for tool in tools])
+            except Exception:
+                logger.warning("写入工具清单失败", exc_info=True)
+        return tools
+
+    async def call_tool(self, name: str, arguments: dict, *args, **kwargs):
+        self.load_provider()
+        return await super().call_tool(name, arguments, *args, **kwargs)
 
 
 def run(args):
@@ -25,25 +125,20 @@ def run(args):
             logger.error("请设置环境变量 PROVIDER 来指定数据供应商")
             raise ValueError("请设置环境变量 PROVIDER 来指定数据供应商")
 
-        module = importlib.import_module("providers._"+data_provider)
-
         if args.transport == 'stdio':
             # 创建MCP服务器实例
-            mcp = FastMCP("finData")
-            # 添加MCP装饰器
-            decorate_async_functions(module, mcp.tool())
+            mcp = FinDataMCP("finData", data_provider, lazy=LAZY_START, single_session=True)
             mcp.run(transport="stdio")
 
 
         elif args.transport == 'sse':
             # 创建MCP服务器实例
-            mcp = FastMCP(
+            mcp = FinDataMCP(
                 "finDatta",
+                data_provider,
                 host=args.sse_host,
                 port=args.sse_port,
             )
-            # 添加MCP装饰器
-            decorate_async_functions(module, mcp.tool())
             mcp.run(transport='sse')
 
     except Exception as e:
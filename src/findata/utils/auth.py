@@ -1,57 +1,285 @@
 import os
+import json
+import queue
+import threading
 from abc import ABC, abstractmethod
+from functools import lru_cache, partial
 from typing import Dict, Type
-import tushare as ts
+import requests
+import pandas as pd
+from requests.adapters import HTTPAdapter
 from utils.findata_log import setup_logger
 
 logger = setup_logger()
 
+# Tushare 数据接口地址，优先沿用tushare客户端内置的地址
+DEFAULT_TUSHARE_HTTP_URL = "http://api.waditu.com/dataapi"
+
+
+@lru_cache(maxsize=1)
+def tushare_http_url() -> str:
+    """首次创建客户端时才导入 tushare（导入较慢，且只为读取接口地址）"""
+    try:
+        from tushare.pro.client import DataApi as _TushareDataApi
+        return getattr(_TushareDataApi, "_DataApi__http_url", DEFAULT_TUSHARE_HTTP_URL)
+    except ImportError:
+        return DEFAULT_TUSHARE_HTTP_URL
+
+# 鉴权失败的错误码
+TUSHARE_AUTH_ERROR_CODES = (40101,)
+
+
+class AuthError(Exception):
+    """数据供应商鉴权失败"""
+
+
+class SessionPool:
+    """
+    HTTP会话池
+
+    复用 requests.Session（保持长连接），池满时直接关闭多余的会话。
+    """
+    def __init__(self, max_size: int = 8, timeout: int = 30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    def acquire(self) -> requests.Session:
+        """从池中取出一个会话，池为空时新建"""
+        try:
+            session = self._pool.get_nowait()
+            with self._lock:
+                self.hits += 1
+            return session
+        except queue.Empty:
+            with self._lock:
+                self.misses += 1
+            return self._new_session()
+
+    def release(self, session: requests.Session):
+        """归还会话，池已满时关闭"""
+        try:
+            self._pool.put_nowait(session)
+        except queue.Full:
+            session.close()
+
+    def discard(self, session: requests.Session):
+        """丢弃失效的会话"""
+        with self._lock:
+            self.discarded += 1
+        session.close()
+
+    def clear(self):
+        """关闭池中所有会话"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def size(self) -> int:
+        return self._pool.qsize()
+
+
+class TushareClient:
+    """
+    Tushare 数据接口客户端
+
+    与 tushare.pro_api() 返回的 DataApi 用法一致（tsObj.daily(...)、tsObj.query("daily", ...)），
+    区别在于请求通过会话池发送，并且不会写入本地token文件。
+    """
+    def __init__(self, token: str, pool_size: int = 8, timeout: int = 30, http_url: str = None):
+        self.token = token
+        self.timeout = timeout
+        self.http_url = http_url or tushare_http_url()
+        self.pool = SessionPool(max_size=pool_size, timeout=timeout)
+        self.reconnects = 0
+        self._lock = threading.Lock()
+
+    def _post(self, api_name: str, req_params: dict) -> dict:
+        session = self.pool.acquire()
+        try:
+            res = session.post(f"{self.http_url}/{api_name}", json=req_params, timeout=self.timeout)
+        except requests.exceptions.ConnectionError:
+            # 长连接已被服务端关闭，换一个新会话重试一次
+            self.pool.discard(session)
+            with self._lock:
+                self.reconnects += 1
+            session = self.pool.acquire()
+            try:
+                res = session.post(f"{self.http_url}/{api_name}", json=req_params, timeout=self.timeout)
+            except Exception:
+                self.pool.discard(session)
+                raise
+        except Exception:
+            self.pool.discard(session)
+            raise
+
+        self.pool.release(session)
+
+        # 非 2xx 响应直接报错，避免被当作空结果写入本地数据
+        res.raise_for_status()
+
+        result = json.loads(res.text)
+        if result["code"] in TUSHARE_AUTH_ERROR_CODES:
+            raise AuthError(result["msg"])
+        if result["code"] != 0:
+            raise Exception(result["msg"])
+        return result["data"]
+
+    def query(self, api_name: str, fields="", **kwargs) -> pd.DataFrame:
+        if isinstance(fields, (list, tuple, set)):
+            fields = ",".join(fields)
+
+        req_params = {
+            "api_name": api_name,
+            "token": self.token,
+            "params": kwargs,
+            "fields": fields,
+        }
+
+        data = self._post(api_name, req_params)
+        if not data:
+            return pd.DataFrame()
+        return pd.DataFrame(data["items"], columns=data["fields"])
+
+    def close(self):
+        self.pool.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool.size(),
+            "pool_hits": self.pool.hits,
+            "pool_misses": self.pool.misses,
+            "pool_discarded": self.pool.discarded,
+            "reconnects": self.reconnects,
+        }
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return partial(self.query, name)
+
+
 class LoginHandler(ABC):
     @abstractmethod
-    def login(self):
+    def login(self, token: str):
         pass
 
 class TushareLoginHandler(LoginHandler):
-    """Tushare 登录处理器""" 
-    def login(self,):
-        api_token = os.getenv("DATA_API_TOKEN")
-        ts.set_token(api_token)
-        pro = ts.pro_api()
-
-        return pro
+    """Tushare 登录处理器"""
+    def login(self, token: str):
+        pool_size = int(os.getenv("FINDATA_SESSION_POOL_SIZE", "8"))
+        timeout = int(os.getenv("FINDATA_HTTP_TIMEOUT", "30"))
+        return TushareClient(token, pool_size=pool_size, timeout=timeout)
 
 
 class LoginFactory:
     """登录工厂类，负责创建合适的登录处理器"""
-    
+
     _handlers = {
         "tushare": TushareLoginHandler,
     }
-    
+
     @classmethod
     def get_handler(cls, provider: str) -> LoginHandler:
         """获取适合指定平台的登录处理器"""
         provider = provider.lower()
         if provider not in cls._handlers:
-            logger.error(f"不支持的登录平台:{provider}") 
+            logger.error(f"不支持的登录平台:{provider}")
             raise ValueError(f"不支持的登录平台: {provider}")
         return cls._handlers[provider]()
-    
 
-def login() -> object:
+
+class SessionManager:
     """
-    登录函数
+    会话管理器
+
+    按 (数据供应商, token) 缓存客户端，整个进程共用；鉴权失败时重建客户端。
     """
-    # 从环境变量获取平台设置
-    provider = os.getenv("PROVIDER").lower()
-    if not provider:
-        logger.error(f"请设置环境变量 PROVIDER 来指定数据供应商") 
-        raise ValueError("请设置环境变量 PROVIDER 来指定数据供应商")
-    
-    try:
-        handler = LoginFactory.get_handler(provider)
-        return handler.login()
-    except Exception as e:
-        logger.error(f"登录失败！\n ", exc_info=True) 
-        return False
-    
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _provider(self) -> str:
+        provider = (os.getenv("PROVIDER") or "").lower()
+        if not provider:
+            logger.error(f"请设置环境变量 PROVIDER 来指定数据供应商")
+            raise ValueError("请设置环境变量 PROVIDER 来指定数据供应商")
+        return provider
+
+    def get_client(self):
+        """获取当前 token 对应的客户端，不存在时创建"""
+        provider = self._provider()
+        token = os.getenv("DATA_API_TOKEN") or ""
+        key = (provider, token)
+
+        client = self._clients.get(key)
+        if client is not None:
+            self.hits += 1
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                self.misses += 1
+                client = LoginFactory.get_handler(provider).login(token)
+                self._clients[key] = client
+                logger.debug(f"创建{provider}客户端")
+            else:
+                self.hits += 1
+        return client
+
+    def refresh(self, client=None):
+        """丢弃失效的客户端，下次获取时重新创建"""
+        with self._lock:
+            self.refreshes += 1
+            for key, value in list(self._clients.items()):
+                if client is None or value is client:
+                    value.close()
+                    del self._clients[key]
+
+    def call(self, api_name: str, **kwargs):
+        """调用数据接口，鉴权失败时刷新客户端并重试一次"""
+        client = self.get_client()
+        try:
+            return client.query(api_name, **kwargs)
+        except AuthError:
+            logger.warning(f"{api_name} 鉴权失败，重建客户端后重试")
+            self.refresh(client)
+            return self.get_client().query(api_name, **kwargs)
+
+    def stats(self) -> dict:
+        stats = {
+            "client_hits": self.hits,
+            "client_misses": self.misses,
+            "client_refreshes": self.refreshes,
+            "pool_hits": 0,
+            "pool_misses": 0,
+            "pool_discarded": 0,
+            "reconnects": 0,
+        }
+        for client in list(self._clients.values()):
+            for name, value in client.stats().items():
+                if name in stats:
+                    stats[name] += value
+        return stats
+
+
+session_manager = SessionManager()
+
@@ -0,0 +1,349 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+import pandas as pd
+from utils.date_processor import standardize_date, standardize_dates
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 优先使用 Arrow IPC 格式（支持内存映射读取），未安装 pyarrow 时退化为 pickle
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_ARROW = True
+except ImportError:
+    pa = None
+    feather = None
+    HAS_ARROW = False
+
+FRAME_SUFFIX = ".arrow" if HAS_ARROW else ".pkl"
+
+
+def get_cache_dir(*parts) -> str:
+    """
+    本地缓存目录，通过环境变量 FINDATA_CACHE_DIR 配置
+    """
+    path = os.path.join(os.getenv("FINDATA_CACHE_DIR", "cache"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_frame(df: pd.DataFrame, path: str) -> int:
+    """
+    将 DataFrame 写入本地文件（先写临时文件再替换），返回文件大小
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    if HAS_ARROW:
+        # 不压缩，读取时可以直接内存映射
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_frame(path: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    读取本地文件中的 DataFrame，Arrow 格式使用内存映射
+    """
+    if HAS_ARROW:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    df = pd.read_pickle(path)
+    return df[columns] if columns else df
+
+
+def is_date_param(name: str) -> bool:
+    return name == "date" or name.endswith("_date")
+
+
+def normalize_params(params: dict) -> dict:
+    """
+    参数标准化：去掉空值，字符串去空格，列表去重排序，日期参数统一为 YYYYMMDD
+    """
+    normalized = {}
+    for name, value in params.items():
+        if value is None or value == "" or value == [] or value == ():
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (list, tuple, set)):
+            value = sorted(set(str(v).strip() for v in value))
+        if is_date_param(name):
+            try:
+                value = standardize_date(value) if isinstance(value, str) else sorted(set(standardize_dates(value).tolist()))
+            except ValueError:
+                pass
+        normalized[name] = value
+    return dict(sorted(normalized.items()))
+
+
+def make_key(api_name: str, params: dict, fields=None) -> str:
+    """
+    由 (接口名, 标准化参数, 字段) 生成缓存键
+    """
+    if isinstance(fields, str):
+        fields = [f for f in fields.split(",") if f]
+    payload = {
+        "api": api_name,
+        "params": normalize_params(params),
+        "fields": sorted(set(fields or [])),
+    }
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    接口结果缓存
+
+    按 (接口名, 标准化参数, 字段) 缓存 DataFrame 到本地列式文件，
+    字段较少的查询可以直接读取相同参数宽表缓存中的部分列；
+    过期时间由 ttl_policy 决定（返回 None 表示数据不再变化，永久有效），
+    总大小超过上限时按最近最少使用淘汰。
+
+    每个缓存项的元数据单独保存在数据文件旁的 .json 文件中（访问时间为其修改时间），
+    写入与删除只涉及该缓存项自身；启动时扫描目录重建内存索引，
+    多个服务进程（stdio 方式下每个客户端一个进程）共用同一目录时互不覆盖。
+    """
+    # 数据文件写入后、元数据文件写入前的间隔内不视为孤立文件
+    ORPHAN_GRACE = 60
+
+    # 淘汰时降到容量上限的比例，避免缓存写满后每次写入都扫描目录
+    EVICT_TO = 0.9
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttl_policy: Optional[Callable] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_policy = ttl_policy
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.projected_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.writes = 0
+        self._scan()
+
+    def _meta_path(self, file_name: str) -> str:
+        return os.path.join(self.cache_dir, file_name[:-len(FRAME_SUFFIX)] + ".json")
+
+    def _read_meta(self, meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            entry["last_access"] = os.path.getmtime(meta_path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry: dict):
+        meta_path = self._meta_path(entry["file"])
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in entry.items() if k != "last_access"}, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _scan(self):
+        """扫描缓存目录重建索引（包括其他进程写入的缓存项），并删除孤立的数据文件"""
+        entries = {}
+        now = time.time()
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            if name == "index.json":
+                # 旧版本的集中索引，已不再使用
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(".json"):
+                entry = self._read_meta(path)
+                if entry is not None and "key" in entry and os.path.exists(os.path.join(self.cache_dir, entry["file"])):
+                    entries[entry["key"]] = entry
+            elif name.endswith(FRAME_SUFFIX) and not os.path.exists(self._meta_path(name)):
+                try:
+                    if now - os.path.getmtime(path) > self.ORPHAN_GRACE:
+                        os.remove(path)
+                except OSError:
+                    pass
+        with self._lock:
+            # 按最近访问时间排序，最久未访问的在前
+            self._entries = OrderedDict(sorted(entries.items(), key=lambda item: item[1]["last_access"]))
+
+    def _lookup(self, api_name: str, key: str) -> Optional[dict]:
+        """内存中没有的缓存项从磁盘读取（可能由其他进程写入）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._read_meta(self._meta_path(f"{api_name}_{key}{FRAME_SUFFIX}"))
+            if entry is not None:
+                self._entries[key] = entry
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for path in (os.path.join(self.cache_dir, entry["file"]), self._meta_path(entry["file"])):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._entries.values())
+
+    def _live_entry(self, api_name: str, key: str) -> Optional[dict]:
+        """返回未过期的缓存项，已过期的缓存项直接删除"""
+        entry = self._lookup(api_name, key)
+        if entry is None:
+            return None
+        if entry["expires"] is not None and entry["expires"] < time.time():
+            self.expired += 1
+            self._remove(key)
+            return None
+        return entry
+
+    def _find_superset(self, api_name: str, params: dict, fields) -> Optional[str]:
+        """查找相同参数、包含全部所需字段的宽表缓存，返回缓存键"""
+        params_key = make_key(api_name, params)
+        wanted = set(fields)
+        for key, entry in reversed(list(self._entries.items())):
+            if entry.get("params_key") != params_key or not entry.get("columns"):
+                continue
+            if wanted <= set(entry["columns"]) and self._live_entry(api_name, key) is not None:
+                return key
+        return None
+
+    def get(self, api_name: str, params: dict, fields=None) -> Optional[pd.DataFrame]:
+        """
+        查询缓存，未命中或已过期时返回 None；
+        指定字段且没有完全相同的缓存时，从相同参数的宽表缓存中只读取所需的列
+        """
+        if isinstance(fields, str):
+            fields = [f for f in fields.split(",") if f]
+        key = make_key(api_name, params, fields)
+        columns = None
+        with self._lock:
+            entry = self._live_entry(api_name, key)
+            if entry is None and fields:
+                key = self._find_superset(api_name, params, fields)
+                entry = self._entries.get(key) if key else None
+                columns = list(fields)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(key)
+            path = os.path.join(self.cache_dir, entry["file"])
+            # 访问时间记录为元数据文件的修改时间，不需要重写文件
+            try:
+                os.utime(self._meta_path(entry["file"]))
+            except OSError:
+                pass
+
+        try:
+            df = read_frame(path, columns=columns)
+        except Exception:
+            logger.warning(f"读取缓存失败: {api_name}", exc_info=True)
+            with self._lock:
+                self.misses += 1
+                self._remove(key)
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if columns:
+                self.projected_hits += 1
+        return df
+
+    def put(self, api_name: str, params: dict, fields, df: pd.DataFrame):
+        """
+        写入缓存，ttl_policy 返回的秒数为有效期，返回 None 表示永久有效
+        """
+        if df is None or df.empty:
+            return
+
+        ttl = self.ttl_policy(api_name, params) if self.ttl_policy else None
+        if ttl is not None and ttl <= 0:
+            return
+
+        key = make_key(api_name, params, fields)
+        file_name = f"{api_name}_{key}{FRAME_SUFFIX}"
+        try:
+            size = write_frame(df, os.path.join(self.cache_dir, file_name))
+        except Exception:
+            logger.warning(f"写入缓存失败: {api_name}", exc_info=True)
+            return
+
+        now = time.time()
+        entry = {
+            "key": key,
+            "api": api_name,
+            "file": file_name,
+            "size": size,
+            "rows": len(df),
+            "params_key": make_key(api_name, params),
+            "columns": [str(c) for c in df.columns],
+            "created": now,
+            "last_access": now,
+            "expires": None if ttl is None else now + ttl,
+        }
+        try:
+            self._write_meta(entry)
+        except Exception:
+            logger.warning(f"写入缓存失败: {api_name}", exc_info=True)
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        """超过容量上限时，淘汰最近最少使用的缓存（先重新扫描目录，计入其他进程写入的缓存）"""
+        if self.total_bytes() <= self.max_bytes:
+            return
+        self._scan()
+        total = self.total_bytes()
+        target = self.max_bytes * self.EVICT_TO
+        while total > target and len(self._entries) > 1:
+            key, entry = next(iter(self._entries.items()))
+            total -= entry["size"]
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._scan()
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "projected_hits": self.projected_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "writes": self.writes,
+                "format": "arrow" if HAS_ARROW else "pickle",
+            }
@@ -0,0 +1,76 @@
+import os
+import json
+import shutil
+import pandas as pd
+from utils.cache import FRAME_SUFFIX, read_frame, write_frame
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+
+class Checkpoint:
+    """
+    批量任务的断点
+
+    已完成的任务键与结果分批写入本地目录，任务失败后再次执行时跳过已完成的部分；
+    全部任务键（universe）也保存在断点中，恢复时按原来的任务范围继续；
+    全部完成后调用 clear 删除断点。
+    """
+    def __init__(self, directory: str, flush_every: int = 100):
+        self.directory = directory
+        self.flush_every = flush_every
+        self.done_path = os.path.join(directory, "done.json")
+        self.done = set()
+        self.universe = []
+        self.frames = []
+        self._pending_keys = []
+        self._pending_frames = []
+        self._parts = 0
+
+    def load(self):
+        """读取已完成的任务键与结果"""
+        if not os.path.exists(self.done_path):
+            return
+        try:
+            with open(self.done_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._parts = meta["parts"]
+            self.frames = [read_frame(os.path.join(self.directory, f"part_{i}{FRAME_SUFFIX}")) for i in range(self._parts)]
+            self.done = set(meta["done"])
+            self.universe = meta.get("universe", [])
+            logger.info(f"从断点恢复: 已完成{len(self.done)}项")
+        except Exception:
+            logger.warning(f"读取断点失败，将重新执行: {self.directory}", exc_info=True)
+            self.done, self.universe, self.frames, self._parts = set(), [], [], 0
+
+    def add(self, key: str, df: pd.DataFrame):
+        self._pending_keys.append(key)
+        if df is not None and not df.empty:
+            self._pending_frames.append(df)
+        if len(self._pending_keys) >= self.flush_every:
+            self.flush()
+
+    def flush(self, force: bool = False):
+        """将未保存的结果写入新的分片，再更新已完成列表"""
+        if not self._pending_keys and not force:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self._pending_frames:
+            part = pd.concat(self._pending_frames, ignore_index=True)
+            write_frame(part, os.path.join(self.directory, f"part_{self._parts}{FRAME_SUFFIX}"))
+            self.frames.append(part)
+            self._parts += 1
+        self.done.update(self._pending_keys)
+        self._pending_keys, self._pending_frames = [], []
+
+        tmp_path = self.done_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"parts": self._parts, "done": sorted(self.done), "universe": self.universe}, f)
+        os.replace(tmp_path, self.done_path)
+
+    def result(self) -> list:
+        """全部结果（包括未保存的）"""
+        return self.frames + self._pending_frames
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,56 +1,128 @@
-from datetime import datetime
+import os
 import re
+from datetime import date, datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# 日期解析结果的缓存数量
+DATE_CACHE_SIZE = int(os.getenv("FINDATA_DATE_CACHE_SIZE", "4096"))
+
+MONTHS = {
+    name: index
+    for index, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ], start=1)
+    for name in names
+}
+
+# 数字日期格式：(正则, 年月日所在的分组)，可以带时间部分
+DATE_PATTERNS = [
+    (re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T].*)?"), (1, 2, 3)),     # 2023-04-15
+    (re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})(?:[ T].*)?"), (1, 2, 3)),     # 2023/04/15
+    (re.compile(r"(\d{4})\.(\d{1,2})\.(\d{1,2})"), (1, 2, 3)),              # 2023.04.15
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), (3, 1, 2)),                # 04/15/2023
+    (re.compile(r"(\d{1,2})-(\d{1,2})-(\d{4})"), (3, 2, 1)),                # 15-04-2023
+    (re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})"), (3, 2, 1)),              # 15.04.2023
+    (re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日?"), (1, 2, 3)),            # 2023年4月15日
+]
+
+# 英文月份格式
+MONTH_FIRST = re.compile(r"([A-Za-z]+)\.? +(\d{1,2}),? +(\d{4})")           # Apr 15, 2023
+DAY_FIRST = re.compile(r"(\d{1,2}) +([A-Za-z]+)\.?,? +(\d{4})")             # 15 Apr 2023
+
+COMPACT_DATE = re.compile(r"\d{8}")
+
+
+def _format(year, month, day) -> str:
+    # 校验日期是否存在（如 2月30日）
+    return date(int(year), int(month), int(day)).strftime("%Y%m%d")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse(text: str) -> str:
+    # 快速路径：已经是 YYYYMMDD
+    if len(text) == 8 and text.isdigit():
+        return _format(text[:4], text[4:6], text[6:])
+
+    for pattern, (y, m, d) in DATE_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            return _format(match.group(y), match.group(m), match.group(d))
+
+    match = MONTH_FIRST.fullmatch(text)
+    if match and match.group(1).lower() in MONTHS:
+        return _format(match.group(3), MONTHS[match.group(1).lower()], match.group(2))
+
+    match = DAY_FIRST.fullmatch(text)
+    if match and match.group(2).lower() in MONTHS:
+        return _format(match.group(3), MONTHS[match.group(2).lower()], match.group(1))
+
+    raise ValueError(text)
 
 
 # 标准化日期
 def standardize_date(input_date):
     """
     将各种格式的日期标准化为 YYYYMMDD 格式
-    
+
     参数:
-        input_date (str): 输入的日期字符串，可以是各种格式
-        
+        input_date (str): 输入的日期字符串，可以是各种格式，也可以是 date/datetime/datetime64
+
     返回:
         str: 标准化后的日期，格式为 YYYYMMDD
     """
-    if len(input_date) == 8:
-
-        input_date = str(input_date)
-
-        # 尝试常见日期格式
-        common_formats = [
-            '%Y-%m-%d',    # 2023-04-15
-            '%Y/%m/%d',    # 2023/04/15
-            '%m/%d/%Y',    # 04/15/2023
-            '%d-%m-%Y',    # 15-04-2023
-            '%d.%m.%Y',     # 15.04.2023
-            '%Y%m%d',      # 20230415 (已经是目标格式)
-            '%b %d, %Y',    # Apr 15, 2023
-            '%B %d, %Y',    # April 15, 2023
-            '%d %b %Y',     # 15 Apr 2023
-            '%d %B %Y',    # 15 April 2023
-        ]
-        
-        # 尝试解析日期
-        for fmt in common_formats:
-            try:
-                dt = datetime.strptime(input_date, fmt)
-                return dt.strftime('%Y%m%d')
-            except ValueError:
-                continue
-        
-        
-        # 尝试处理中文日期（如2023年4月15日）
-        cn_match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', input_date)
-        if cn_match:
-            year = cn_match.group(1)
-            month = cn_match.group(2).zfill(2)
-            day = cn_match.group(3).zfill(2)
+    if isinstance(input_date, (date, datetime)):
+        return input_date.strftime("%Y%m%d")
+    if isinstance(input_date, np.datetime64):
+        return str(input_date.astype("datetime64[D]")).replace("-", "")
+
+    try:
+        return _parse(str(input_date).strip())
+    except ValueError:
+        raise ValueError(f"无法解析日期: {input_date}") from None
+
+
+def standardize_dates(dates) -> np.ndarray:
+    """
+    批量标准化日期，返回 YYYYMMDD 字符串数组
+
+    YYYYMMDD 格式的日期整列校验，其余格式按不重复的值逐个解析；
+    无法解析的日期抛出 ValueError。
+    """
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return np.char.replace(np.datetime_as_string(dates.astype("datetime64[D]"), unit="D"), "-", "")
+
+    values = pd.Series(dates, dtype="object").astype(str).str.strip()
+    if values.empty:
+        return np.array([], dtype="<U8")
+
+    result = pd.Series(np.nan, index=values.index, dtype="object")
+    compact = values.str.fullmatch(COMPACT_DATE.pattern)
+    if compact.any():
+        parsed = pd.to_datetime(values[compact], format="%Y%m%d", errors="coerce")
+        result[compact] = values[compact].where(parsed.notna())
+
+    others = ~compact
+    if others.any():
+        unique = values[others].unique()
+        mapping = {}
+        for value in unique:
             try:
-                datetime.strptime(f"{year}{month}{day}", '%Y%m%d')
-                return f"{year}{month}{day}"
+                mapping[value] = _parse(value)
             except ValueError:
-                pass
-    
-    # 如果所有尝试都失败，抛出异常
-    raise ValueError(f"无法解析日期: {input_date}")
\ No newline at end of file
+                mapping[value] = np.nan
+        result[others] = values[others].map(mapping)
+
+    invalid = result.isna()
+    if invalid.any():
+        bad = values[invalid].unique()[:5]
+        raise ValueError(f"无法解析日期: {', '.join(bad)}")
+    return result.to_numpy(dtype="<U8")
+
+
+def date_cache_info() -> dict:
+    info = _parse.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
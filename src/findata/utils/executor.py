@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+
+def parse_limits(value: str) -> dict:
+    """
+    解析 "daily=8,income=2" 形式的配置
+    """
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, limit = item.split("=", 1)
+        limits[name.strip()] = int(limit)
+    return limits
+
+
+class ToolExecutor:
+    """
+    工具执行器
+
+    将阻塞的数据接口调用放入有界线程池执行，避免阻塞 MCP 服务的事件循环；
+    同时按接口名限制并发数，并统计排队深度与耗时。
+    """
+    def __init__(self, max_workers: int = 16, default_limit: int = 4, limits: dict = None):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = limits or {}
+        self._pool = None
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="findata")
+        return self._pool
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.get(name, self.default_limit))
+            self._semaphores[name] = semaphore
+        return semaphore
+
+    def _metric(self, name: str) -> dict:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = {
+                "calls": 0,
+                "errors": 0,
+                "waiting": 0,
+                "running": 0,
+                "max_waiting": 0,
+                "wait_seconds": 0.0,
+                "run_seconds": 0.0,
+            }
+            self._metrics[name] = metric
+        return metric
+
+    async def run(self, name: str, func, *args, **kwargs):
+        """
+        在线程池中执行阻塞函数，name 用于并发限制与统计
+        """
+        metric = self._metric(name)
+        semaphore = self._semaphore(name)
+
+        metric["waiting"] += 1
+        metric["max_waiting"] = max(metric["max_waiting"], metric["waiting"])
+        start = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            metric["waiting"] -= 1
+
+        started = time.perf_counter()
+        metric["wait_seconds"] += started - start
+        metric["running"] += 1
+        metric["calls"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, partial(func, *args, **kwargs))
+        except Exception:
+            metric["errors"] += 1
+            raise
+        finally:
+            metric["running"] -= 1
+            metric["run_seconds"] += time.perf_counter() - started
+            semaphore.release()
+
+    def stats(self) -> dict:
+        pool_queue = self._pool._work_queue.qsize() if self._pool is not None else 0
+        return {
+            "max_workers": self.max_workers,
+            "pool_queue_depth": pool_queue,
+            "tools": {name: dict(metric) for name, metric in self._metrics.items()},
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+executor = ToolExecutor(
+    max_workers=int(os.getenv("FINDATA_EXECUTOR_WORKERS", "16")),
+    default_limit=int(os.getenv("FINDATA_TOOL_CONCURRENCY", "4")),
+    limits=parse_limits(os.getenv("FINDATA_TOOL_LIMITS", "")),
+)
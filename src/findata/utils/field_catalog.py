@@ -0,0 +1,139 @@
+import os
+import re
+import inspect
+from typing import Optional
+
+# Fields 段落中的字段行，如 "- ts_code: 股票代码"、"- ts_code：股票代码"、"- month - 月份"
+FIELD_LINE = re.compile(r"^\s*-\s*([A-Za-z0-9_]+)\s*(?:[:：]|-)\s*(.*?)\s*$")
+
+# 表格行中单元格两侧的空白（精简模式下去掉对齐用的空格）
+TABLE_CELL = re.compile(r"\s*\|\s*")
+TABLE_RULE = re.compile(r"-{3,}")
+
+# 精简模式：工具说明中不包含字段列表，字段说明由 field_dictionary 工具按需查询
+COMPACT_TOOLS = os.getenv("FINDATA_COMPACT_TOOLS", "0") == "1"
+
+
+def is_section(line: str) -> bool:
+    """段落标题，如 "Fields:"（cleandoc 之后位于行首）"""
+    stripped = line.strip()
+    return stripped.endswith(":") and not stripped.startswith("-") and not line.startswith(" ")
+
+
+def parse_fields(doc: str, section: str = "Fields:") -> dict:
+    """
+    解析工具说明中 Fields 段落，返回 {字段名: 字段说明}，保持原有顺序
+    """
+    fields = {}
+    in_fields = False
+    for line in inspect.cleandoc(doc or "").splitlines():
+        stripped = line.strip()
+        if not in_fields:
+            in_fields = stripped == section
+            continue
+        # 遇到下一个段落标题时结束
+        if is_section(line):
+            break
+        match = FIELD_LINE.match(line)
+        if match:
+            fields[match.group(1)] = match.group(2)
+    return fields
+
+
+def compact_doc(doc: str, api_name: str, section: str = "Fields:") -> str:
+    """
+    精简工具说明：字段列表段落替换为一行提示，表格去掉对齐用的空格，其余内容保持不变
+    """
+    lines = []
+    skipping = False
+    for line in inspect.cleandoc(doc or "").splitlines():
+        if is_section(line):
+            skipping = line.strip() == section
+            if skipping:
+                lines.append(line)
+                lines.append(f"    字段说明请使用 field_dictionary 工具查询（api_name={api_name}）")
+                continue
+        if skipping:
+            continue
+        if line.strip().startswith("|"):
+            line = line[:len(line) - len(line.lstrip())] + TABLE_RULE.sub("---", TABLE_CELL.sub("|", line.strip()))
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class FieldCatalog:
+    """
+    字段目录
+
+    导入时从各工具说明的 Fields 段落生成一次，用于校验请求的字段，
+    并计算需要向接口请求的最小字段集合。
+    """
+    def __init__(self):
+        self._apis = {}
+        self._sections = {}
+
+    def register(self, api_name: str, doc: str, section: str = "Fields:"):
+        fields = parse_fields(doc, section)
+        if fields:
+            self._apis[api_name] = fields
+            self._sections[api_name] = section
+
+    def section(self, api_name: str) -> str:
+        """字段列表所在的段落标题，未注册时返回空字符串"""
+        return self._sections.get(api_name, "")
+
+    def apis(self) -> list:
+        return list(self._apis)
+
+    def fields(self, api_name: str) -> list:
+        return list(self._apis.get(api_name, {}))
+
+    def describe(self, api_name: str) -> dict:
+        return dict(self._apis.get(api_name, {}))
+
+    def records(self) -> list:
+        """全部字段说明：[(接口名, 字段名, 字段说明)]"""
+        return [(api_name, field, desc) for api_name, fields in self._apis.items() for field, desc in fields.items()]
+
+    def validate(self, api_name: str, fields) -> list:
+        """校验字段是否存在，返回去重后的字段列表"""
+        if isinstance(fields, str):
+            fields = [f for f in fields.split(",")]
+        fields = list(dict.fromkeys(f.strip() for f in (fields or []) if f and f.strip()))
+
+        known = self._apis.get(api_name)
+        if known is None:
+            return fields
+        unknown = [f for f in fields if f not in known]
+        if unknown:
+            raise ValueError(f"{api_name} 不支持的字段: {', '.join(unknown)}")
+        return fields
+
+    def projection(self, api_name: str, fields, required: Optional[list] = None) -> list:
+        """
+        计算向接口请求的字段：校验后加上必须返回的字段，按目录中的顺序排列；
+        未指定字段时返回空列表，表示请求全部字段
+        """
+        fields = self.validate(api_name, fields)
+        if not fields:
+            return []
+
+        wanted = set(fields) | set(required or [])
+        known = self._apis.get(api_name)
+        if known is None:
+            return list(dict.fromkeys(fields + list(required or [])))
+        # 目录中未列出的必需字段追加在最后
+        return [f for f in known if f in wanted] + [f for f in dict.fromkeys(required or []) if f not in known]
+
+
+field_catalog = FieldCatalog()
+
+
+def register_fields(api_name: str = "", section: str = "Fields:"):
+    """
+    装饰器：将工具说明中的 Fields（或 section 指定的段落）注册到字段目录，api_name 默认为函数名
+    """
+    def decorator(func):
+        field_catalog.register(api_name or func.__name__, func.__doc__, section)
+        return func
+    return decorator
@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+from importlib import metadata
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 生成工具清单所依赖的源码目录（相对于 finData 根目录），根目录下的 .py 文件（server.py 等）也包括在内
+MANIFEST_SOURCES = ("utils",)
+
+
+def _source_files(root: str, provider: str) -> list:
+    """参与哈希的源码文件；不遍历整个根目录，避免扫描缓存、日志目录"""
+    files = [os.path.join(root, name) for name in os.listdir(root) if name.endswith(".py")]
+    for directory in (os.path.join("providers", "_" + provider),) + MANIFEST_SOURCES:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+            files.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".py"))
+    return sorted(files)
+
+
+def source_hash(root: str, provider: str, extra: str = "") -> str:
+    """
+    工具清单的缓存键：server.py、数据供应商与 utils 下全部源码的内容哈希，加上 mcp 的版本；
+    任何一个文件改动或升级 mcp 后清单自动失效
+    """
+    digest = hashlib.sha1()
+    for path in _source_files(root, provider):
+        digest.update(os.path.relpath(path, root).encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    try:
+        digest.update(metadata.version("mcp").encode("utf-8"))
+    except metadata.PackageNotFoundError:
+        pass
+    digest.update(extra.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def manifest_path(provider: str, digest: str) -> str:
+    """
+    工具清单文件，与其他本地缓存一样位于 FINDATA_CACHE_DIR 下
+    （这里不使用 utils.cache，避免启动时导入 pandas）
+    """
+    return os.path.join(os.getenv("FINDATA_CACHE_DIR", "cache"), "manifest", f"{provider}_{digest}.json")
+
+
+def load_manifest(path: str):
+    """读取工具清单，不存在或损坏时返回 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logger.warning(f"读取工具清单失败，将重新生成: {path}", exc_info=True)
+        return None
+
+
+def save_manifest(path: str, tools: list):
+    """写入工具清单，并删除同一数据供应商的旧清单"""
+    directory, filename = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(tools, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    prefix = filename.rsplit("_", 1)[0] + "_"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".json") and name != filename:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,106 @@
+import os
+import time
+import uuid
+import base64
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# 默认每页行数，0 表示不分页
+DEFAULT_PAGE_SIZE = int(os.getenv("FINDATA_PAGE_SIZE", "500"))
+
+# 分页结果在服务端保留的时间（秒）与数量上限
+PAGE_TTL = int(os.getenv("FINDATA_PAGE_TTL", "600"))
+MAX_BUFFERS = int(os.getenv("FINDATA_PAGE_BUFFERS", "64"))
+
+
+def encode_cursor(buffer_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{buffer_id}:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        buffer_id, offset = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").rsplit(":", 1)
+        return buffer_id, int(offset)
+    except Exception:
+        raise ValueError(f"无效的cursor: {cursor}")
+
+
+class ResultBuffer:
+    """
+    分页结果缓冲区
+
+    第一页返回后，完整结果保留在服务端，后续页直接从缓冲区切片，不再请求数据接口；
+    超过有效期或数量上限（最早的先淘汰）的结果会被清除。
+    """
+    def __init__(self, ttl: int = PAGE_TTL, max_buffers: int = MAX_BUFFERS):
+        self.ttl = ttl
+        self.max_buffers = max_buffers
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        for buffer_id in [k for k, (expires, _, _) in self._buffers.items() if expires <= now]:
+            del self._buffers[buffer_id]
+        while len(self._buffers) > self.max_buffers:
+            self._buffers.popitem(last=False)
+
+    def put(self, tool_name: str, df: pd.DataFrame) -> str:
+        buffer_id = uuid.uuid4().hex
+        with self._lock:
+            now = time.time()
+            self._buffers[buffer_id] = (now + self.ttl, tool_name, df)
+            self._purge(now)
+        return buffer_id
+
+    def get(self, buffer_id: str) -> pd.DataFrame:
+        with self._lock:
+            self._purge(time.time())
+            entry = self._buffers.get(buffer_id)
+            if entry is None:
+                raise ValueError("cursor已过期或无效，请重新查询")
+            # 访问后延长有效期
+            self._buffers[buffer_id] = (time.time() + self.ttl, entry[1], entry[2])
+            self._buffers.move_to_end(buffer_id)
+            return entry[2]
+
+    def size(self) -> int:
+        return len(self._buffers)
+
+
+result_buffer = ResultBuffer()
+
+
+def first_page(tool_name: str, df: pd.DataFrame, page_size: int):
+    """
+    返回第一页及分页信息；结果超过一页时将完整结果放入缓冲区
+    """
+    page_size = page_size if page_size and page_size > 0 else DEFAULT_PAGE_SIZE
+    total = len(df)
+    if not page_size or total <= page_size:
+        return df, {"total_rows": total, "offset": 0, "next_cursor": None}
+
+    buffer_id = result_buffer.put(tool_name, df)
+    return df.iloc[:page_size], {
+        "total_rows": total,
+        "offset": 0,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(buffer_id, page_size),
+    }
+
+
+def next_page(cursor: str, page_size: int):
+    """
+    根据 cursor 从缓冲区返回下一页及分页信息
+    """
+    buffer_id, offset = decode_cursor(cursor)
+    df = result_buffer.get(buffer_id)
+    page_size = page_size if page_size and page_size > 0 else (DEFAULT_PAGE_SIZE or len(df))
+    end = offset + page_size
+    return df.iloc[offset:end], {
+        "total_rows": len(df),
+        "offset": offset,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(buffer_id, end) if end < len(df) else None,
+    }
@@ -0,0 +1,157 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from utils.executor import parse_limits
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 优先级，数值越小越先获得令牌
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITY_BACKGROUND = 2
+
+# 当前任务的默认优先级，后台任务中设置后，其中发起的请求都按该优先级排队
+request_priority = contextvars.ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BULK: "bulk",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    按每分钟配额匀速补充令牌，令牌不足时调用方异步排队等待（而不是失败），
+    排队的请求按优先级、先来后到的顺序获得令牌。
+    """
+    def __init__(self, per_minute: int, capacity: int = None):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        # 默认允许约10秒配额的突发量，避免同一分钟内超出配额
+        self.capacity = capacity or max(per_minute // 6, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._wakeup = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _schedule(self, loop):
+        if self._wakeup is not None:
+            return
+        self._refill()
+        delay = max((1 - self.tokens) / self.rate, 0)
+        self._wakeup = loop.call_later(delay, self._dispatch, loop)
+
+    def _dispatch(self, loop):
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            # 已取消的等待者直接跳过
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            self._schedule(loop)
+
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """
+        获取一个令牌，返回等待的秒数
+        """
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule(loop)
+
+        start = time.monotonic()
+        await future
+        return time.monotonic() - start
+
+    def penalize(self):
+        """接口返回超出配额时清空令牌，后续请求等待补充"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - self.capacity
+
+
+class RateLimiter:
+    """
+    按接口名限流
+
+    每个接口一个令牌桶，配额（次/分钟）通过 limits 配置，未配置的接口使用 default_per_minute；
+    统计各接口、各优先级被限流的次数与等待时间。
+    """
+    def __init__(self, default_per_minute: int = 200, limits: dict = None):
+        self.default_per_minute = default_per_minute
+        self.limits = limits or {}
+        self._buckets = {}
+        self._metrics = {}
+
+    def bucket(self, api_name: str) -> TokenBucket:
+        bucket = self._buckets.get(api_name)
+        if bucket is None:
+            bucket = TokenBucket(self.limits.get(api_name, self.default_per_minute))
+            self._buckets[api_name] = bucket
+        return bucket
+
+    def _metric(self, api_name: str) -> dict:
+        metric = self._metrics.get(api_name)
+        if metric is None:
+            metric = {
+                "acquired": 0,
+                "throttled": 0,
+                "throttled_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+                "rejected_upstream": 0,
+                "throttled_seconds_by_priority": {name: 0.0 for name in PRIORITY_NAMES.values()},
+            }
+            self._metrics[api_name] = metric
+        return metric
+
+    async def acquire(self, api_name: str, priority: int = PRIORITY_INTERACTIVE):
+        waited = await self.bucket(api_name).acquire(priority)
+
+        metric = self._metric(api_name)
+        metric["acquired"] += 1
+        if waited > 0:
+            metric["throttled"] += 1
+            metric["throttled_seconds"] += waited
+            metric["max_wait_seconds"] = max(metric["max_wait_seconds"], waited)
+            metric["throttled_seconds_by_priority"][PRIORITY_NAMES.get(priority, str(priority))] += waited
+
+    def penalize(self, api_name: str):
+        self._metric(api_name)["rejected_upstream"] += 1
+        self.bucket(api_name).penalize()
+
+    def stats(self) -> dict:
+        stats = {}
+        for api_name, metric in self._metrics.items():
+            bucket = self.bucket(api_name)
+            stats[api_name] = dict(metric, per_minute=bucket.per_minute, waiting=bucket.waiting())
+        return stats
+
+
+rate_limiter = RateLimiter(
+    default_per_minute=int(os.getenv("FINDATA_RATE_LIMIT", "200")),
+    limits=parse_limits(os.getenv("FINDATA_RATE_LIMITS", "")),
+)
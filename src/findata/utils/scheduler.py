@@ -0,0 +1,155 @@
+import os
+import time
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+from utils.rate_limiter import PRIORITY_BACKGROUND, request_priority
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+# 是否启用后台任务
+SCHEDULER_ENABLED = os.getenv("FINDATA_SCHEDULER", "1") == "1"
+
+
+def parse_schedule(text: str) -> dict:
+    """解析 "name=trigger,name=trigger" 形式的任务配置"""
+    schedule = {}
+    for item in (text or "").split(","):
+        name, _, trigger = item.partition("=")
+        if name.strip() and trigger.strip():
+            schedule[name.strip()] = trigger.strip()
+    return schedule
+
+
+def parse_trigger(trigger: str):
+    """
+    解析触发方式：
+    - startup：启动时执行一次
+    - HH:MM：每天在该时间执行
+    - 数字：每隔该秒数执行一次（启动时先执行一次）
+    - off：不执行
+    """
+    trigger = trigger.strip().lower()
+    if trigger in ("startup", "off"):
+        return trigger, None
+    if ":" in trigger:
+        hour, minute = trigger.split(":")
+        return "daily", (int(hour), int(minute))
+    return "interval", float(trigger)
+
+
+def seconds_until(hour: int, minute: int, now: datetime = None) -> float:
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Awaitable], trigger: str):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+
+
+class Scheduler:
+    """
+    后台任务调度
+
+    在服务进程的事件循环中按配置的时间执行预取、预热等任务；
+    任务中发起的接口请求以后台优先级排队，不会阻塞交互式的工具调用。
+    触发方式可以通过环境变量 FINDATA_SCHEDULE 覆盖，如 "daily_snapshot=17:30,macro=off"。
+    """
+    def __init__(self, overrides: dict = None):
+        self.overrides = overrides or {}
+        self.jobs = {}
+        self._tasks = {}
+        self._started = False
+
+    def add(self, name: str, func: Callable[[], Awaitable], trigger: str):
+        self.jobs[name] = Job(name, func, self.overrides.get(name, trigger))
+
+    async def run_job(self, job: Job):
+        request_priority.set(PRIORITY_BACKGROUND)
+        start = time.monotonic()
+        try:
+            await job.func()
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.warning(f"后台任务{job.name}执行失败", exc_info=True)
+        finally:
+            job.runs += 1
+            job.last_run = time.time()
+            job.last_duration = time.monotonic() - start
+
+    async def _loop(self, job: Job):
+        kind, value = parse_trigger(job.trigger)
+        if kind == "off":
+            return
+        if kind in ("startup", "interval"):
+            await self.run_job(job)
+            if kind == "startup":
+                return
+        while True:
+            await asyncio.sleep(value if kind == "interval" else seconds_until(*value))
+            await self.run_job(job)
+
+    def start(self):
+        """
+        在当前事件循环中启动全部任务；每个进程只启动一次，再次调用时只启动新注册的任务
+        （SSE 方式下每个连接都会进入一次服务的 lifespan，已启动的任务不会重复执行）
+        """
+        self._started = True
+        self.launch()
+
+    def launch(self):
+        """启动尚未运行的任务，服务运行中才注册的任务（延迟加载数据供应商时）也由此启动"""
+        if not SCHEDULER_ENABLED or not self._started:
+            return
+        jobs = [job for job in self.jobs.values() if job.name not in self._tasks]
+        for job in jobs:
+            try:
+                parse_trigger(job.trigger)
+            except ValueError:
+                logger.error(f"后台任务{job.name}的触发方式无效: {job.trigger}")
+                continue
+            self._tasks[job.name] = asyncio.ensure_future(self._loop(job))
+        if jobs:
+            logger.info(f"启动后台任务: {', '.join(f'{job.name}({job.trigger})' for job in jobs)}")
+
+    async def stop(self):
+        """停止全部任务，在服务进程退出时调用"""
+        self._started = False
+        if not self._tasks:
+            return
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+    def stats(self) -> dict:
+        return {
+            job.name: {
+                "trigger": job.trigger,
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_run": job.last_run,
+                "last_duration": job.last_duration,
+                "last_error": job.last_error,
+            }
+            for job in self.jobs.values()
+        }
+
+
+scheduler = Scheduler(parse_schedule(os.getenv("FINDATA_SCHEDULE", "")))
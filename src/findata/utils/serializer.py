@@ -0,0 +1,125 @@
+import io
+import os
+import json
+import base64
+from typing import Iterator, Optional
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+FORMATS = ("json", "csv", "arrow")
+
+# 默认输出格式
+DEFAULT_FORMAT = os.getenv("FINDATA_OUTPUT_FORMAT", "json")
+
+# 每次序列化的行数
+CHUNK_ROWS = int(os.getenv("FINDATA_SERIALIZE_CHUNK_ROWS", "5000"))
+
+
+def _json_dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _dtypes(df: pd.DataFrame) -> dict:
+    return {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def iter_json(df: pd.DataFrame, meta: dict, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    列式JSON：列名只出现一次，数据按行以数组输出；NaN 输出为 null
+    """
+    yield '{"format": "json", '
+    for name, value in meta.items():
+        yield f"{_json_dumps(name)}: {_json_dumps(value)}, "
+    yield f'"rows": {len(df)}, "columns": {_json_dumps([str(c) for c in df.columns])}, '
+    yield f'"dtypes": {_json_dumps(_dtypes(df))}, "data": ['
+
+    first = True
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        text = chunk.to_json(orient="values", date_format="iso", force_ascii=False)[1:-1]
+        if not text:
+            continue
+        yield text if first else "," + text
+        first = False
+    yield "]}"
+
+
+def iter_csv(df: pd.DataFrame, meta: dict, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    CSV：元数据以 # 开头的注释行输出在表头之前；NaN 输出为空值
+    """
+    meta = dict(meta, rows=len(df))
+    for name, value in meta.items():
+        yield f"# {name}: {_json_dumps(value)}\n"
+
+    if not len(df):
+        yield df.to_csv(index=False)
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0))
+
+
+def _arrow_schema(df: pd.DataFrame, table) -> "pa.Schema":
+    """
+    以第一批数据推断的 schema 为准；第一批中全为空值的列（推断为 null 类型）按该列第一个非空值推断类型
+    """
+    fields = []
+    for field in table.schema:
+        if pa.types.is_null(field.type):
+            values = df[field.name].dropna()
+            if len(values):
+                field = field.with_type(pa.array(values.iloc[:1]).type)
+        fields.append(field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def iter_arrow(df: pd.DataFrame, meta: dict, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    Arrow IPC 流格式，按批写入后以 base64 编码，放在 JSON 的 data 字段中
+    """
+    if pa is None:
+        raise ValueError("输出格式 arrow 需要安装 pyarrow")
+
+    # 空表的 object 列会被推断为 null 类型，schema 必须由实际数据推断
+    first = pa.Table.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+    schema = _arrow_schema(df, first)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(first.cast(schema))
+        for start in range(chunk_rows, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    yield '{"format": "arrow", '
+    for name, value in meta.items():
+        yield f"{_json_dumps(name)}: {_json_dumps(value)}, "
+    yield f'"rows": {len(df)}, "data": "'
+    yield base64.b64encode(sink.getbuffer()).decode("ascii")
+    yield '"}'
+
+
+_SERIALIZERS = {
+    "json": iter_json,
+    "csv": iter_csv,
+    "arrow": iter_arrow,
+}
+
+
+def serialize(df: pd.DataFrame, output_format: str = "", meta: Optional[dict] = None,
+              chunk_rows: int = CHUNK_ROWS) -> str:
+    """
+    将 DataFrame 序列化为字符串；按块转换（每次只转换 chunk_rows 行），
+    MCP 工具结果需要完整的文本，各块最终拼接为一个字符串
+    """
+    output_format = (output_format or DEFAULT_FORMAT).lower()
+    if output_format not in _SERIALIZERS:
+        raise ValueError(f"不支持的输出格式: {output_format}，可选: {', '.join(FORMATS)}")
+
+    meta = dict(meta or {})
+    meta.update({str(k): v for k, v in df.attrs.items()})
+
+    return "".join(_SERIALIZERS[output_format](df, meta, chunk_rows))
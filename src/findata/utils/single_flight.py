@@ -0,0 +1,72 @@
+import os
+import time
+import asyncio
+from typing import Awaitable, Callable
+from utils.findata_log import setup_logger
+
+logger = setup_logger()
+
+
+class SingleFlight:
+    """
+    合并相同的并发请求
+
+    相同 key 的请求在执行期间只执行一次，其余调用方等待并共享同一个结果；
+    执行结束后 linger 秒内到达的调用方直接使用该结果，不再重复请求。
+    某个调用方被取消不会影响其他调用方，共享的请求会继续执行。
+    """
+    def __init__(self, linger: float = 1.0):
+        self.linger = linger
+        self._tasks = {}
+        self._recent = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.late_joins = 0
+
+    def _purge(self, now: float):
+        for key in [key for key, (expires, _) in self._recent.items() if expires <= now]:
+            del self._recent[key]
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is None:
+            self._recent[key] = (time.monotonic() + self.linger, task.result())
+
+    async def do(self, key: str, func: Callable[[], Awaitable]):
+        """
+        执行 func，相同 key 正在执行或刚刚完成时共享其结果；返回 (结果, 是否为共享结果)
+        """
+        self.calls += 1
+        now = time.monotonic()
+        self._purge(now)
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            self.coalesced += 1
+            self.late_joins += 1
+            return recent[1], True
+
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.executed += 1
+        task = asyncio.ensure_future(func())
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "late_joins": self.late_joins,
+            "in_flight": len(self._tasks),
+        }
+
+
+single_flight = SingleFlight(linger=float(os.getenv("FINDATA_SINGLE_FLIGHT_LINGER", "1.0")))
@@ -0,0 +1,74 @@
+import inspect
+import functools
+from typing import Annotated, Optional
+import pandas as pd
+from pydantic import Field
+from utils.field_catalog import COMPACT_TOOLS, compact_doc, field_catalog
+from utils.serializer import serialize
+from utils.pagination import first_page, next_page
+
+# 工具层统一增加的参数
+TOOL_PARAMS = [
+    inspect.Parameter(
+        "output_format",
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default="",
+        annotation=Annotated[
+            Optional[str],
+            Field(description="输出格式：json（列式JSON，默认）、csv、arrow（Arrow IPC，base64编码）"),
+        ],
+    ),
+    inspect.Parameter(
+        "page_size",
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default=0,
+        annotation=Annotated[
+            Optional[int],
+            Field(description="每页行数，不填使用服务端默认值；结果超过一页时返回next_cursor，使用 next_page 工具获取后续页"),
+        ],
+    ),
+]
+
+
+def wrap_tool(func):
+    """
+    工具装饰器：增加 output_format、page_size 参数；
+    返回的 DataFrame 分页后序列化，后续页通过 next_page 工具从服务端缓冲区读取，不再调用工具；
+    精简模式下工具说明不包含字段列表
+    """
+    signature = inspect.signature(func)
+    tool_name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, output_format: str = "", page_size: int = 0, **kwargs):
+        result = await func(*args, **kwargs)
+        if not isinstance(result, pd.DataFrame):
+            return result
+
+        page, meta = first_page(tool_name, result, page_size)
+        return serialize(page, output_format, meta)
+
+    if COMPACT_TOOLS and field_catalog.section(tool_name):
+        wrapper.__doc__ = compact_doc(func.__doc__, tool_name, field_catalog.section(tool_name))
+
+    wrapper.__signature__ = signature.replace(
+        parameters=list(signature.parameters.values()) + TOOL_PARAMS
+    )
+    return wrapper
+
+
+async def fetch_next_page(
+    cursor: Annotated[str, Field(description="上一页返回的next_cursor")],
+    page_size: Annotated[Optional[int], Field(description="每页行数，不填使用服务端默认值")] = 0,
+    output_format: Annotated[Optional[str], Field(description="输出格式：json（列式JSON，默认）、csv、arrow（Arrow IPC，base64编码）")] = "",
+) -> str:
+    """
+    Name:
+        分页结果的下一页。
+
+    Description:
+        任一工具的结果超过一页时会返回 next_cursor，使用本工具获取后续页；
+        结果从服务端缓冲区读取，不需要重复原查询的参数，也不会再次请求数据接口。
+    """
+    page, meta = next_page(cursor, page_size)
+    return serialize(page, output_format, meta)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 服务以 src/findata 为根目录导入模块（utils、providers）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "findata"))
+
+# 本地缓存写到临时目录，不污染工作目录
+os.environ.setdefault("FINDATA_CACHE_DIR", tempfile.mkdtemp(prefix="findata_test_"))
@@ -0,0 +1,23 @@
+import asyncio
+import pandas as pd
+from providers._tushare import macroeconomicData
+
+
+def test_macro_panel_last_takes_period_end(monkeypatch):
+    # 本地宏观序列按期间降序返回：202406 -> 202401
+    cpi = pd.DataFrame({
+        "month": [f"2024{m:02d}" for m in range(6, 0, -1)],
+        "nt_val": [6.0, 5.0, 4.0, 3.0, 2.0, 1.0],
+    })
+
+    async def query(api_name, *args, **kwargs):
+        return cpi.copy()
+
+    monkeypatch.setattr(macroeconomicData.macro_store, "query", query)
+
+    panel = asyncio.run(macroeconomicData.macro_panel(
+        ["cn_cpi.nt_val"], freq="Q", start_date="20240101", end_date="20240630", how="last",
+    ))
+
+    assert panel["period"].tolist() == ["2024Q2", "2024Q1"]
+    assert panel["nt_val"].tolist() == [6.0, 3.0]